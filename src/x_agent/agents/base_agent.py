@@ -1,9 +1,18 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TYPE_CHECKING, TypeVar
 
 if TYPE_CHECKING:
     from ..database import DatabaseManager
 
+T = TypeVar("T")
+
+# SQLite serializes writers anyway, so all DB work runs on one dedicated thread
+# instead of competing with blocking API calls for the default executor.
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="x-agent-db")
+
 
 class BaseAgent(ABC):
     """
@@ -14,6 +23,11 @@ class BaseAgent(ABC):
     def __init__(self, db_manager: "DatabaseManager", *args, **kwargs):
         self.db = db_manager
 
+    async def _db_call(self, func: Callable[..., T], *args: Any) -> T:
+        """Runs a blocking database call on the dedicated DB thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_DB_EXECUTOR, functools.partial(func, *args))
+
     @abstractmethod
     async def execute(self):
         """
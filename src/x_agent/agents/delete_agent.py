@@ -4,7 +4,7 @@ import tweepy
 import json
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Iterator, List
 from .base_agent import BaseAgent
 from ..services.x_service import XService
 
@@ -12,6 +12,59 @@ if TYPE_CHECKING:
     from ..database import DatabaseManager
 
 
+ARCHIVE_READ_SIZE = 1 << 20
+# Characters that may separate the elements of the archive's JSON array
+_ARRAY_FILLER = frozenset(" \t\r\n,")
+
+
+def iter_archive_batches(
+    path: Path, read_size: int = ARCHIVE_READ_SIZE
+) -> Iterator[List[dict]]:
+    """
+    Yields the entries of an X archive file in batches, one per block read.
+
+    Archive files (tweets.js) are JS files wrapping a JSON array:
+    window.YTD.tweets.part0 = [ ... ]
+    Entries are decoded one at a time from a rolling buffer, so the whole
+    file is never held in memory at once.
+    """
+    decoder = json.JSONDecoder()
+    with path.open(encoding="utf-8") as f:
+        buffer = ""
+        while (start := buffer.find("[")) == -1:
+            block = f.read(read_size)
+            if not block:
+                raise ValueError("No JSON array found in archive.")
+            buffer += block
+        buffer = buffer[start + 1 :]
+
+        at_eof = False
+        while True:
+            batch = []
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in _ARRAY_FILLER:
+                    pos += 1
+                if buffer.startswith("]", pos):
+                    if batch:
+                        yield batch
+                    return
+                try:
+                    entry, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Entry cut off at the end of the buffer; read more
+                    if at_eof:
+                        raise
+                    break
+                batch.append(entry)
+            if batch:
+                yield batch
+            buffer = buffer[pos:]
+            block = f.read(read_size)
+            at_eof = not block
+            buffer += block
+
+
 class MockStatus:
     """Mock a Tweepy Status object for _process_tweet"""
 
@@ -75,10 +128,10 @@ class DeleteAgent(BaseAgent):
         """
         logging.info("--- X Delete Agent ---")
         await self.x_service.ensure_initialized()
-        await asyncio.to_thread(self.db.initialize_database)
+        await self._db_call(self.db.initialize_database)
 
         # Load already deleted IDs to optimize processing (Batch fetch)
-        self.deleted_tweet_ids = await asyncio.to_thread(self.db.get_all_deleted_tweet_ids)
+        self.deleted_tweet_ids = await self._db_call(self.db.get_all_deleted_tweet_ids)
         logging.info(f"Loaded {len(self.deleted_tweet_ids)} already deleted tweet IDs.")
 
         if self.dry_run:
@@ -104,35 +157,36 @@ class DeleteAgent(BaseAgent):
 
     async def _process_archive(self, now: datetime):
         """Parses and processes tweets from an X archive file."""
-        if not self.archive_path.exists():
-            logging.error(f"Archive file not found: {self.archive_path}")
-            return
-
         logging.info(f"Processing archive: {self.archive_path}")
+        batches = iter_archive_batches(self.archive_path)
+        total = 0
+        # Deletions wait until the whole file has been decoded, so a truncated
+        # or malformed archive is rejected before any tweet is deleted.
+        deferred = []
         try:
-            content = await asyncio.to_thread(
-                self.archive_path.read_text, encoding="utf-8"
-            )
-            # Archive files (tweets.js) are JS files, we need the JSON part
-            # window.YTD.tweets.part0 = [ ... ]
-            json_str = content[content.find("[") :]
-            tweets_data = json.loads(json_str)
-
-            logging.info(f"Found {len(tweets_data)} tweets in archive.")
-
-            for entry in tweets_data:
-                tweet_raw = entry.get("tweet", {})
-                # Create a pseudo-tweet object compatible with _process_tweet
-                # X Archive date format: "Wed Oct 24 10:00:00 +0000 2018"
-                created_at = datetime.strptime(
-                    tweet_raw["created_at"], "%a %b %d %H:%M:%S %z %Y"
-                )
-
-                tweet = MockStatus(tweet_raw, created_at)
-                await self._process_tweet(tweet, now)
-
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                for entry in batch:
+                    tweet_raw = entry.get("tweet", {})
+                    # Create a pseudo-tweet object compatible with _process_tweet
+                    # X Archive date format: "Wed Oct 24 10:00:00 +0000 2018"
+                    created_at = datetime.strptime(
+                        tweet_raw["created_at"], "%a %b %d %H:%M:%S %z %Y"
+                    )
+
+                    tweet = MockStatus(tweet_raw, created_at)
+                    await self._process_tweet(tweet, now, deferred)
+                total += len(batch)
+
+        except FileNotFoundError:
+            logging.error(f"Archive file not found: {self.archive_path}")
+            return
         except Exception as e:
             logging.error(f"Failed to process archive: {e}", exc_info=True)
+            return
+
+        for deletion in deferred:
+            await self._delete_tweet(*deletion)
+        logging.info(f"Processed {total} tweets from archive.")
 
     async def _process_live_api(self, now: datetime):
         """Fetches tweets from live API and processes them."""
@@ -164,8 +218,13 @@ class DeleteAgent(BaseAgent):
 
             await asyncio.sleep(1)
 
-    async def _process_tweet(self, tweet, now: datetime):
-        """Applies the rules to a single tweet (Status object) and deletes if necessary."""
+    async def _process_tweet(self, tweet, now: datetime, deferred: list | None = None):
+        """
+        Applies the rules to a single tweet (Status object) and deletes if necessary.
+
+        If `deferred` is given, deletions are appended to it as _delete_tweet
+        arguments for the caller to carry out later, instead of done now.
+        """
         tweet_id = tweet.id
 
         # Skip if already deleted (checkpointing) - Using local cache to avoid N+1 query
@@ -211,7 +270,9 @@ class DeleteAgent(BaseAgent):
         # --- RULE 3: Retweet Cleanup (> 30 days) ---
         if is_retweet and age > timedelta(days=self.RETWEET_MAX_AGE_DAYS):
             reason = f"old retweet (> {self.RETWEET_MAX_AGE_DAYS} days)"
-            await self._delete_tweet(tweet, engagement_score, is_response, reason)
+            await self._delete_tweet(
+                tweet, engagement_score, is_response, reason, deferred
+            )
             return
 
         # --- RULE 4: High Value Content (Threads & Media) ---
@@ -230,7 +291,9 @@ class DeleteAgent(BaseAgent):
             reason = (
                 f"older than {self.CRITICAL_AGE_DAYS} days and no special protection"
             )
-            await self._delete_tweet(tweet, engagement_score, is_response, reason)
+            await self._delete_tweet(
+                tweet, engagement_score, is_response, reason, deferred
+            )
             return
 
         # --- RULE 6: Engagement Thresholds (7 days to 1 year) ---
@@ -255,10 +318,15 @@ class DeleteAgent(BaseAgent):
 
         # --- RULE 7: Otherwise, delete ---
         reason = f"low engagement ({engagement_score} < {threshold})"
-        await self._delete_tweet(tweet, engagement_score, is_response, reason)
-
-    async def _delete_tweet(self, tweet, engagement, is_response, reason):
-        """Helper to delete and log."""
+        await self._delete_tweet(tweet, engagement_score, is_response, reason, deferred)
+
+    async def _delete_tweet(
+        self, tweet, engagement, is_response, reason, deferred=None
+    ):
+        """Helper to delete and log, or to queue the deletion on `deferred`."""
+        if deferred is not None:
+            deferred.append((tweet, engagement, is_response, reason))
+            return
         tweet_id = tweet.id
         text = getattr(tweet, "full_text", getattr(tweet, "text", "No text"))
         # Clean up text for logging
@@ -275,7 +343,7 @@ class DeleteAgent(BaseAgent):
             if success:
                 self.stats["deleted"] += 1
                 self.deleted_tweet_ids.add(tweet_id)
-                await asyncio.to_thread(
+                await self._db_call(
                     self.db.log_deleted_tweet,
                     tweet_id,
                     text,
@@ -35,21 +35,27 @@ class InsightsAgent(BaseAgent):
         """Runs the insights agent to generate and store the report."""
         logging.info("Starting the insights agent...")
 
-        await asyncio.to_thread(self.db.initialize_database)
+        await self._db_call(self.db.initialize_database)
 
-        try:
-            if not self.x_service.user_id:
-                await self.x_service.initialize()
-
-            response = await self.x_service.get_me()
-            me_data = response.data
-        except tweepy.errors.TweepyException as e:
-            logging.error(f"Could not retrieve user metrics: {e}")
-            return None
+        if not self.x_service.user_id:
+            await self.x_service.initialize()
 
-        if not me_data or not me_data.public_metrics:
-            logging.error("Could not retrieve user metrics. Aborting.")
-            return None
+        # The follower ID pagination is independent of the metrics lookup, so
+        # start it right away instead of waiting for get_me to return.
+        logging.info("Fetching current follower IDs for change detection...")
+        follower_ids_task = asyncio.create_task(self.x_service.get_follower_user_ids())
+        try:
+            me_data = await self._get_me_data()
+            if me_data is None:
+                return None
+
+            # Follower change detection (logic from UnfollowAgent)
+            # Read the stored followers while the API pagination is still running
+            previous_follower_ids = await self._db_call(self.db.get_all_follower_ids)
+            current_follower_ids = await follower_ids_task
+        finally:
+            # Stops the fetch on any early exit; a no-op once it has finished
+            follower_ids_task.cancel()
 
         metrics = me_data.public_metrics
         current_followers_count = metrics.get("followers_count", 0)
@@ -58,36 +64,16 @@ class InsightsAgent(BaseAgent):
         current_listed_count = metrics.get("listed_count", 0)
         created_at = me_data.created_at
 
-        # Follower change detection (logic from UnfollowAgent)
-        logging.info("Fetching current follower IDs for change detection...")
-        current_follower_ids = await self.x_service.get_follower_user_ids()
-        previous_follower_ids = await asyncio.to_thread(self.db.get_all_follower_ids)
-
-        new_follower_users = []
-        lost_follower_users = []
-
-        if previous_follower_ids:
-            new_ids = list(current_follower_ids - previous_follower_ids)
-            lost_ids = list(previous_follower_ids - current_follower_ids)
-
-            if new_ids:
-                logging.info(f"Resolving {len(new_ids)} new follower usernames...")
-                new_follower_users = await self.x_service.get_users_by_ids(new_ids)
-
-            if lost_ids:
-                logging.info(f"Resolving {len(lost_ids)} lost follower usernames...")
-                lost_follower_users = await self.x_service.get_users_by_ids(lost_ids)
-
-        # Update follower list in DB
-        await asyncio.to_thread(self.db.replace_followers, current_follower_ids)
-
-        # Get historical metrics from the database for timeframes
-        comparisons = {
-            "Previous": await asyncio.to_thread(self.db.get_latest_insight),
-            "24h Ago": await asyncio.to_thread(self.db.get_insight_at_offset, 1),
-            "7d Ago": await asyncio.to_thread(self.db.get_insight_at_offset, 7),
-            "30d Ago": await asyncio.to_thread(self.db.get_insight_at_offset, 30),
-        }
+        # Username lookups go to the API while the history reads run on the
+        # DB thread; neither depends on the other.
+        follower_changes, comparisons = await asyncio.gather(
+            self._resolve_follower_changes(current_follower_ids, previous_follower_ids),
+            self._load_comparisons(),
+        )
+        new_follower_users, lost_follower_users = follower_changes
+        # Only replace the snapshot once the changes were resolved, so a failed
+        # lookup leaves them to be reported on the next run.
+        await self._db_call(self.db.replace_followers, current_follower_ids)
 
         # Generate the report
         report = self._generate_report(
@@ -105,7 +91,7 @@ class InsightsAgent(BaseAgent):
         print(report)
 
         # Save the new metrics to the database
-        await asyncio.to_thread(
+        await self._db_call(
             self.db.add_insight,
             current_followers_count,
             current_following_count,
@@ -116,6 +102,56 @@ class InsightsAgent(BaseAgent):
         logging.info("Insights agent finished successfully.")
         return report
 
+    async def _get_me_data(self) -> tweepy.User | None:
+        """Fetches the account's own user data, or None without its metrics."""
+        try:
+            response = await self.x_service.get_me()
+        except tweepy.errors.TweepyException as e:
+            logging.error(f"Could not retrieve user metrics: {e}")
+            return None
+
+        if not response.data or not response.data.public_metrics:
+            logging.error("Could not retrieve user metrics. Aborting.")
+            return None
+        return response.data
+
+    async def _resolve_follower_changes(
+        self, current_follower_ids: set[int], previous_follower_ids: set[int]
+    ) -> tuple[list[tweepy.User], list[tweepy.User]]:
+        """Resolves the users who started and stopped following since last run."""
+        if not previous_follower_ids or previous_follower_ids == current_follower_ids:
+            return [], []
+
+        new_ids = list(current_follower_ids - previous_follower_ids)
+        lost_ids = list(previous_follower_ids - current_follower_ids)
+
+        if new_ids:
+            logging.info(f"Resolving {len(new_ids)} new follower usernames...")
+        if lost_ids:
+            logging.info(f"Resolving {len(lost_ids)} lost follower usernames...")
+
+        # One after the other: both lookups share the v2 client, which a rate
+        # limit in either one would recreate under the other.
+        new_users = await self._resolve_users(new_ids)
+        lost_users = await self._resolve_users(lost_ids)
+        return new_users, lost_users
+
+    async def _load_comparisons(self) -> dict[str, Optional[sqlite3.Row]]:
+        """Gets historical metrics from the database for each report timeframe."""
+        at_offsets = await self._db_call(self.db.get_insights_at_offsets, (1, 7, 30))
+        return {
+            "Previous": await self._db_call(self.db.get_latest_insight),
+            "24h Ago": at_offsets.get(1),
+            "7d Ago": at_offsets.get(7),
+            "30d Ago": at_offsets.get(30),
+        }
+
+    async def _resolve_users(self, user_ids: list[int]) -> list[tweepy.User]:
+        """Looks up user objects for the given IDs, skipping the call if empty."""
+        if not user_ids:
+            return []
+        return await self.x_service.get_users_by_ids(user_ids)
+
     def _generate_report(
         self,
         current_followers: int,
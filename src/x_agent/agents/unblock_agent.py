@@ -1,6 +1,7 @@
 import logging
 import asyncio
 import time
+from array import array
 from typing import TYPE_CHECKING
 from .base_agent import BaseAgent
 from ..services.x_service import XService
@@ -8,12 +9,19 @@ from ..services.x_service import XService
 if TYPE_CHECKING:
     from ..database import DatabaseManager
 
+# Shared across hot-path log calls instead of building a new dict per record
+_SINGLE_LINE_EXTRA = {"single_line": True}
+
 
 class UnblockAgent(BaseAgent):
     """
     An agent responsible for unblocking all blocked users on an X account.
     """
 
+    MAX_CONCURRENCY = 20
+    FLUSH_EVERY = 50
+    READ_CHUNK_SIZE = 500
+
     def __init__(
         self,
         x_service: XService,
@@ -21,6 +29,7 @@ class UnblockAgent(BaseAgent):
         dry_run: bool = False,
         user_id: int | None = None,
         refresh: bool = False,
+        concurrency: int | None = None,
     ) -> None:
         """
         Initializes the agent.
@@ -31,15 +40,24 @@ class UnblockAgent(BaseAgent):
             dry_run: If True, simulate actions.
             user_id: Optional. A specific user ID to unblock.
             refresh: Optional. If True, re-fetches blocked IDs from API.
+            concurrency: Optional. Maximum unblock requests in flight at once.
+                Defaults to MAX_CONCURRENCY.
         """
         super().__init__(db_manager)
         self.x_service = x_service
         self.dry_run = dry_run
         self.user_id = user_id
         self.refresh = refresh
+        self.max_concurrency = (
+            concurrency if concurrency is not None else self.MAX_CONCURRENCY
+        )
+        self._concurrency = self.max_concurrency
+        self._slots = asyncio.Condition()
 
         if self.user_id is not None and not isinstance(self.user_id, int):
             raise TypeError("User ID must be an integer")
+        if self.max_concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
 
     async def execute(self) -> None:
         """
@@ -48,7 +66,7 @@ class UnblockAgent(BaseAgent):
         Fetches the list of blocked users, stores them in the DB, and unblocks them.
         """
         await self.x_service.ensure_initialized()
-        await asyncio.to_thread(self.db.initialize_database)
+        await self._db_call(self.db.initialize_database)
 
         if self.dry_run:
             logging.info("DRY RUN ENABLED: No changes will be made to X.")
@@ -65,13 +83,13 @@ class UnblockAgent(BaseAgent):
             if status == "SUCCESS":
                 logging.info(f"Successfully unblocked {self.user_id}.")
                 if not self.dry_run:
-                    await asyncio.to_thread(
+                    await self._db_call(
                         self.db.update_user_status, self.user_id, "UNBLOCKED"
                     )
             else:
                 logging.error(f"Failed to unblock {self.user_id}: {status}")
                 if not self.dry_run:
-                    await asyncio.to_thread(
+                    await self._db_call(
                         self.db.update_user_status, self.user_id, "FAILED"
                     )
             return
@@ -79,8 +97,8 @@ class UnblockAgent(BaseAgent):
         logging.info("--- X Unblock Agent (Async) ---")
 
         # --- State Loading and Resumption Logic ---
-        total_blocked_count = await asyncio.to_thread(
-            self.db.get_all_blocked_users_count
+        total_blocked_count, pending_count = await self._db_call(
+            self.db.get_blocked_users_state
         )
 
         if total_blocked_count == 0 or self.refresh:
@@ -88,91 +106,186 @@ class UnblockAgent(BaseAgent):
                 logging.info(
                     "Refresh requested. Fetching latest blocked IDs from API..."
                 )
-                await asyncio.to_thread(self.db.clear_pending_blocked_users)
+                await self._db_call(self.db.clear_pending_blocked_users)
             else:
                 logging.info(
                     "No local cache of blocked IDs found. Fetching from the API..."
                 )
 
-            all_blocked_ids = await self.x_service.get_blocked_user_ids()
+            all_blocked_ids = await self.x_service.get_blocked_user_ids(resume=True)
             if all_blocked_ids:
-                await asyncio.to_thread(self.db.add_blocked_users, all_blocked_ids)
-                total_blocked_count = await asyncio.to_thread(
-                    self.db.get_all_blocked_users_count
-                )
+                await self._db_call(self.db.add_blocked_users, all_blocked_ids)
                 logging.info(f"Saved {len(all_blocked_ids)} blocked IDs to database.")
             else:
                 if not self.refresh:
                     logging.info("No blocked IDs found from the API.")
                     return
 
-        pending_ids = await asyncio.to_thread(self.db.get_pending_blocked_users)
+            total_blocked_count, pending_count = await self._db_call(
+                self.db.get_blocked_users_state
+            )
 
-        logging.info(f"Remaining accounts to unblock: {len(pending_ids)}.")
+        logging.info(f"Remaining accounts to unblock: {pending_count}.")
 
-        if not pending_ids:
+        if not pending_count:
             logging.info(
                 "All accounts from the list have been unblocked. Nothing to do!"
             )
             return
 
         # --- Unblocking Process ---
-        await self._unblock_user_ids(pending_ids)
+        await self._unblock_pending_users(pending_count)
 
-    async def _unblock_user_ids(
-        self,
-        ids_to_unblock: list[int],
-    ) -> None:
+    async def set_concurrency(self, limit: int) -> None:
+        """Changes how many unblock requests may be in flight at once."""
+        async with self._slots:
+            self._concurrency = max(1, min(limit, self.max_concurrency))
+            self._slots.notify_all()
+
+    async def _on_rate_limit(self) -> None:
+        """Halves concurrency when the X API signals rate-limit backpressure."""
+        new_limit = max(1, self._concurrency // 2)
+        if new_limit < self._concurrency:
+            logging.info(f"Rate limited. Reducing unblock concurrency to {new_limit}.")
+        await self.set_concurrency(new_limit)
+
+    async def _wait_for_turn(self, index: int, done: asyncio.Event) -> bool:
+        """
+        Parks worker `index` while the concurrency limit is at or below it.
+
+        Only throttled workers touch the condition; at full concurrency this
+        is a single comparison per ID. Returns False if `done` is set while
+        the worker is still over the limit: no more IDs will be queued and
+        the workers within the limit drain the rest, so it can stop.
+        """
+        if index < self._concurrency:
+            return True
+        async with self._slots:
+            await self._slots.wait_for(
+                lambda: index < self._concurrency or done.is_set()
+            )
+            return index < self._concurrency
+
+    async def _unblock_pending_users(self, total_to_unblock_session: int) -> None:
         """
-        Iterates through a list of user IDs and unblocks each one concurrently in batches.
+        Unblocks all pending user IDs concurrently, saving results as they complete.
+
+        IDs are streamed from the DB in chunks of READ_CHUNK_SIZE into a bounded
+        queue, so only a small window of them is held in memory at any time.
         """
-        total_to_unblock_session = len(ids_to_unblock)
         logging.info(
             f"Starting the unblocking process for {total_to_unblock_session} accounts..."
         )
 
         start_time = time.time()
-        sem = asyncio.Semaphore(20)
-        # We'll collect results and update the DB in chunks to ensure progress is saved
-        batch_size = 50
         session_stats = {"SUCCESS": 0, "NOT_FOUND": 0, "FAILED": 0}
+        pending: asyncio.Queue[int | None] = asyncio.Queue(
+            maxsize=2 * self.max_concurrency
+        )
+        # Workers hand results to a single writer task which saves them to the DB
+        # every FLUSH_EVERY completions, so network calls never wait on SQLite.
+        results: asyncio.Queue[tuple[int, str] | None] = asyncio.Queue()
+        # Packed int64 buffers, one per outcome, instead of a dict of lists
+        unblocked, not_found, failed = array("q"), array("q"), array("q")
 
-        async def unblock_worker(user_id: int) -> tuple[int, str]:
-            if self.dry_run:
-                # Simulate work
-                logging.info(
-                    f"[Dry Run] Would unblock {user_id}", extra={"single_line": True}
-                )
-                return user_id, "SUCCESS"
+        feeding_done = asyncio.Event()
+
+        async def feed_pending() -> None:
+            chunks = self.db.iter_pending_blocked_users(self.READ_CHUNK_SIZE)
+            while (chunk := await self._db_call(next, chunks, None)) is not None:
+                for user_id in chunk:
+                    await pending.put(user_id)
+            async with self._slots:
+                feeding_done.set()
+                self._slots.notify_all()
+            for _ in range(self.max_concurrency):
+                await pending.put(None)
+
+        # A fixed pool of long-lived workers; the concurrency limit decides how
+        # many of them may pull from the queue at any moment.
+        async def unblock_worker(index: int) -> None:
+            while True:
+                if not await self._wait_for_turn(index, feeding_done):
+                    return
+                if (user_id := await pending.get()) is None:
+                    return
+                if self.dry_run:
+                    # Simulate work
+                    logging.info(
+                        "[Dry Run] Would unblock %d", user_id, extra=_SINGLE_LINE_EXTRA
+                    )
+                    await results.put((user_id, "SUCCESS"))
+                    continue
 
-            async with sem:
                 status = await self.x_service.unblock_user(user_id)
+                logging.debug("Processed ID %d: %s", user_id, status)
+                await results.put((user_id, status))
+
+        async def flush() -> None:
+            nonlocal unblocked, not_found, failed
+            session_stats["SUCCESS"] += len(unblocked)
+            session_stats["NOT_FOUND"] += len(not_found)
+            session_stats["FAILED"] += len(failed)
+            if not self.dry_run:
                 logging.info(
-                    f"Processed ID {user_id}: {status}", extra={"single_line": True}
+                    f"[{sum(session_stats.values())}/{total_to_unblock_session}] "
+                    f"Processed accounts ({session_stats['SUCCESS']} unblocked)",
+                    extra=_SINGLE_LINE_EXTRA,
                 )
-                return user_id, status
+                # One transaction per flush, whatever the mix of outcomes
+                updates = {
+                    status: list(uids)
+                    for status, uids in (
+                        ("UNBLOCKED", unblocked),
+                        ("NOT_FOUND", not_found),
+                        ("FAILED", failed),
+                    )
+                    if uids
+                }
+                await self._db_call(self.db.apply_status_updates, updates)
+            unblocked, not_found, failed = array("q"), array("q"), array("q")
 
-        for i in range(0, len(ids_to_unblock), batch_size):
-            chunk = ids_to_unblock[i : i + batch_size]
-            tasks = [unblock_worker(uid) for uid in chunk]
-            results = await asyncio.gather(*tasks)
+            # Recover concurrency gradually after rate-limit backoff
+            if self._concurrency < self.max_concurrency:
+                await self.set_concurrency(self._concurrency + 1)
 
-            # Process chunk results
-            chunk_status_map = {"SUCCESS": [], "NOT_FOUND": [], "FAILED": []}
-            for user_id, status in results:
-                if status in chunk_status_map:
-                    chunk_status_map[status].append(user_id)
-                    session_stats[status] += 1
+        async def db_writer() -> None:
+            buffered = 0
+            while (result := await results.get()) is not None:
+                user_id, status = result
+                if status == "SUCCESS":
+                    unblocked.append(user_id)
+                elif status == "NOT_FOUND":
+                    not_found.append(user_id)
+                elif status == "FAILED":
+                    failed.append(user_id)
+                else:
+                    continue
+                buffered += 1
+                if buffered >= self.FLUSH_EVERY:
+                    await flush()
+                    buffered = 0
+            if buffered:
+                await flush()
 
-            # Update database for this chunk
-            if not self.dry_run:
-                for status, uids in chunk_status_map.items():
-                    if uids:
-                        await asyncio.to_thread(
-                            self.db.update_user_statuses,
-                            uids,
-                            status if status != "SUCCESS" else "UNBLOCKED",
-                        )
+        # The service may outlive this agent, so the hook is only set while the
+        # workers run and the previous one is put back afterwards.
+        previous_hook = self.x_service.on_rate_limit
+        self.x_service.on_rate_limit = self._on_rate_limit
+        writer = asyncio.create_task(db_writer())
+        tasks = [asyncio.create_task(feed_pending())]
+        tasks += [
+            asyncio.create_task(unblock_worker(i)) for i in range(self.max_concurrency)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.x_service.on_rate_limit = previous_hook
+            for task in tasks:
+                task.cancel()
+            # Always drain what was already processed, even if a worker failed
+            await results.put(None)
+            await writer
 
         end_time = time.time()
         duration = end_time - start_time
@@ -38,20 +38,23 @@ class UnfollowAgent(BaseAgent):
         Executes the unfollow detection logic.
         1) Gets current follower list from the API.
         2) Compares to the follower list stored in the DB.
-        3) Stores the new follower list.
-        4) Shows stats and stores unfollow events in the DB.
+        3) Shows stats.
+        4) Stores the new follower list and unfollow events in the DB.
         """
         logging.info("--- X Unfollow Detection Agent ---")
         await self.x_service.ensure_initialized()
-        await asyncio.to_thread(self.db.initialize_database)
+        await self._db_call(self.db.initialize_database)
 
-        # 1) Get current follower list from the API
+        # 1) Get current follower list from the API, reading the stored list
+        # from the DB at the same time
         logging.info("Fetching current followers from X API...")
-        current_followers = await self.x_service.get_follower_user_ids()
+        current_followers, previous_followers = await asyncio.gather(
+            self.x_service.get_follower_user_ids(),
+            self._db_call(self.db.get_all_follower_ids),
+        )
 
         # 2) Compare to the follower list stored on the DB
         logging.info("Comparing with previously stored followers...")
-        previous_followers = await asyncio.to_thread(self.db.get_all_follower_ids)
 
         if not previous_followers:
             logging.info(
@@ -59,29 +62,35 @@ class UnfollowAgent(BaseAgent):
             )
             unfollowed_ids = set()
             new_followers_count = len(current_followers)
+        elif previous_followers == current_followers:
+            unfollowed_ids = set()
+            new_followers_count = 0
         else:
             unfollowed_ids = previous_followers - current_followers
-            new_followers = current_followers - previous_followers
-            new_followers_count = len(new_followers)
-
-        # 3) Store the new follower list
-        if self.dry_run:
-            logging.info("[Dry Run] Would update follower list in database.")
-        else:
-            logging.info("Updating follower list in database...")
-            await asyncio.to_thread(self.db.replace_followers, current_followers)
+            # Followers kept = previous - unfollowed, so the new followers can be
+            # counted without materializing a second set difference.
+            kept_count = len(previous_followers) - len(unfollowed_ids)
+            new_followers_count = len(current_followers) - kept_count
 
-        # 4) Show stats and store unfollow events
+        # 3) Show stats
         self._report_stats(len(current_followers), unfollowed_ids, new_followers_count)
 
-        if unfollowed_ids:
-            if self.dry_run:
+        # 4) Store the new follower list and unfollow events together
+        if self.dry_run:
+            logging.info("[Dry Run] Would update follower list in database.")
+            if unfollowed_ids:
                 logging.info(
                     f"[Dry Run] Would log {len(unfollowed_ids)} unfollow events."
                 )
-            else:
+        else:
+            logging.info("Updating follower list in database...")
+            if unfollowed_ids:
                 logging.info(f"Logging {len(unfollowed_ids)} unfollow events...")
-                await asyncio.to_thread(self.db.log_unfollows, list(unfollowed_ids))
+            await self._db_call(
+                self.db.replace_followers_and_log_unfollows,
+                current_followers,
+                unfollowed_ids,
+            )
 
         logging.info("Unfollow detection completed.")
 
@@ -89,14 +98,17 @@ class UnfollowAgent(BaseAgent):
         self, current_total: int, unfollowed_ids: set[int], new_followers_count: int
     ) -> None:
         """Reports the findings to the console."""
-        print("\n--- Unfollow Detection Report ---")
-        print(f"Total Followers: {current_total}")
-        print(f"New Followers:   {new_followers_count}")
-        print(f"Unfollows:       {len(unfollowed_ids)}")
+        lines = [
+            "\n--- Unfollow Detection Report ---",
+            f"Total Followers: {current_total}",
+            f"New Followers:   {new_followers_count}",
+            f"Unfollows:       {len(unfollowed_ids)}",
+        ]
 
         if unfollowed_ids:
-            print("\nIDs that unfollowed you:")
-            for uid in sorted(unfollowed_ids):
-                print(f" - {uid}")
+            lines.append("\nIDs that unfollowed you:")
+            lines.extend(map(" - {}".format, sorted(unfollowed_ids)))
 
-        print("---------------------------------\n")
+        lines.append("---------------------------------\n")
+        # One write for the whole report instead of one per unfollowed ID
+        print("\n".join(lines))
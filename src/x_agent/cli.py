@@ -1,18 +1,15 @@
-import sys
 import logging
 import typer
 import asyncio
-from typing import Optional, List
-from .services.x_service import XService
-from .agents.unblock_agent import UnblockAgent
-from .agents.insights_agent import InsightsAgent
-from .agents.blocked_ids_agent import BlockedIdsAgent
-from .agents.unfollow_agent import UnfollowAgent
-from .agents.delete_agent import DeleteAgent
-from .utils.email_utils import send_report_email
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Optional, List, TYPE_CHECKING
 from .logging_setup import setup_logging
 from .config import settings
-from .database import DatabaseManager
+from .database import STATE_DIR, DatabaseManager
+
+if TYPE_CHECKING:
+    from .services.x_service import XService
 
 app = typer.Typer(
     name="x-agent",
@@ -23,16 +20,60 @@ app = typer.Typer(
 db_app = typer.Typer(help="Database management commands.")
 app.add_typer(db_app, name="db")
 
+# Options shared by the agent commands, defined once instead of per command
+DEBUG_OPTION = typer.Option(
+    False, "--debug", help="Enable debug logging for detailed output."
+)
+DRY_RUN_OPTION = typer.Option(
+    False, "--dry-run", help="Simulate actions without making changes."
+)
+EMAIL_OPTION = typer.Option(
+    False, "--email", help="Send the report via email after generation."
+)
+
+
+class AppState:
+    """
+    Objects shared by the callback and the command of one CLI invocation.
+
+    Each is built on first access, so commands that never touch the API
+    don't construct (or import) XService.
+    """
+
+    @cached_property
+    def db(self) -> DatabaseManager:
+        return DatabaseManager()
+
+    @cached_property
+    def x_service(self) -> "XService":
+        # Deferred so that metadata commands and --help never import tweepy
+        from .services.x_service import XService
+
+        return XService(
+            blocked_ids_checkpoint=STATE_DIR / "blocked_ids_checkpoint.jsonl"
+        )
+
 
 @app.callback()
-def main_callback():
+def main_callback(ctx: typer.Context):
     """
-    Validate configuration before running any command.
+    Set up the state shared by the command.
+    """
+    ctx.obj = AppState()
+
+
+def _check_config(ctx: typer.Context) -> None:
+    """
+    Validates the configuration and shows the environment banner.
+
+    Called by each command rather than by the app callback: click handles a
+    subcommand's --help while parsing its arguments, so help then exits
+    before this runs and works without a valid configuration.
     """
     try:
         settings.check_config()
         # Display environment info at startup
-        db_manager = DatabaseManager()
+        db_manager = ctx.obj.db
         env_str = typer.style(
             settings.environment.upper(),
             fg=typer.colors.GREEN if settings.is_dev else typer.colors.YELLOW,
@@ -47,14 +88,19 @@ def main_callback():
 
 @db_app.command("backup")
 def db_backup(
+    ctx: typer.Context,
     debug: bool = typer.Option(False, "--debug", help="Enable debug logging."),
 ):
     """
     Create a backup of the database.
     """
+    _check_config(ctx)
     setup_logging(debug)
-    db_manager = DatabaseManager()
-    backup_path = db_manager.backup_database()
+    db_manager = ctx.obj.db
+    try:
+        backup_path = db_manager.backup_database()
+    finally:
+        db_manager.close()
     if backup_path:
         typer.echo(f"Backup created at: {backup_path}")
     else:
@@ -62,113 +108,146 @@ def db_backup(
 
 
 @db_app.command("info")
-def db_info():
+def db_info(ctx: typer.Context):
     """
     Show database configuration info.
     """
-    db_manager = DatabaseManager()
+    _check_config(ctx)
+    db_manager = ctx.obj.db
     typer.echo(f"Environment: {settings.environment}")
     typer.echo(f"Database File: {db_manager.db_path}")
     typer.echo(f"Is Dev: {settings.is_dev}")
 
 
-async def _execute_agent(agent_class, debug: bool, email: bool = False, **kwargs):
+async def _execute_agent(
+    state: AppState, agent_class, debug: bool, email: bool = False, **kwargs
+):
     """
     Shared helper to initialize service, run an agent, and optionally send an email report.
     """
+    # Deferred so that metadata commands and --help never import aiosmtplib
+    from .utils.email_utils import send_report_email
+
     setup_logging(debug)
-    x_service = XService()
-    db_manager = DatabaseManager()
+    x_service = state.x_service
+    db_manager = state.db
     try:
         agent = agent_class(x_service, db_manager, **kwargs)
         report = await agent.execute()
         if email and report:
             await send_report_email(report)
-    except Exception:
-        raise
     finally:
         await x_service.close()
+        db_manager.close()
 
 
-def _run_agent(agent_class, debug: bool, dry_run: bool = False, **kwargs):
+def _loop_factory():
     """
-    Legacy helper to run an agent without email support.
+    Returns uvloop's event loop factory if it is installed, else None so that
+    asyncio uses its default loop.
     """
     try:
-        return asyncio.run(
-            _execute_agent(agent_class, debug, dry_run=dry_run, **kwargs)
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+@contextmanager
+def _run_guard():
+    """
+    Logs any unexpected error with its traceback and exits with status 1.
+    """
+    try:
+        yield
+    except Exception:
+        logging.exception("An unexpected error occurred")
+        raise typer.Exit(code=1)
+
+
+def _run_agent(
+    ctx: typer.Context, agent_class, debug: bool, email: bool = False, **kwargs
+):
+    """
+    Runs an agent to completion, always closing its XService, and exits with
+    status 1 on any unexpected error.
+    """
+    _check_config(ctx)
+    with _run_guard():
+        asyncio.run(
+            _execute_agent(ctx.obj, agent_class, debug, email=email, **kwargs),
+            loop_factory=_loop_factory(),
         )
-    except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}", exc_info=True)
-        sys.exit(1)
 
 
 @app.command()
 def unblock(
+    ctx: typer.Context,
     user_id: Optional[int] = typer.Option(
         None, "--user-id", help="Optional: Specify a single user ID to unblock."
     ),
     refresh: bool = typer.Option(
         False, "--refresh", help="Re-fetch blocked IDs from API, ignoring local cache."
     ),
-    debug: bool = typer.Option(
-        False, "--debug", help="Enable debug logging for detailed output."
-    ),
-    dry_run: bool = typer.Option(
-        False, "--dry-run", help="Simulate actions without making changes."
+    concurrency: Optional[int] = typer.Option(
+        None,
+        "--concurrency",
+        min=1,
+        help="Maximum unblock requests in flight at once (default: 20).",
     ),
+    debug: bool = DEBUG_OPTION,
+    dry_run: bool = DRY_RUN_OPTION,
 ):
     """
     Run the unblock agent to unblock blocked accounts.
     """
-    _run_agent(UnblockAgent, debug, dry_run=dry_run, user_id=user_id, refresh=refresh)
+    from .agents.unblock_agent import UnblockAgent
+
+    _run_agent(
+        ctx,
+        UnblockAgent,
+        debug,
+        dry_run=dry_run,
+        user_id=user_id,
+        refresh=refresh,
+        concurrency=concurrency,
+    )
 
 
 @app.command()
 def insights(
-    debug: bool = typer.Option(
-        False, "--debug", help="Enable debug logging for detailed output."
-    ),
-    email: bool = typer.Option(
-        False, "--email", help="Send the report via email after generation."
-    ),
+    ctx: typer.Context,
+    debug: bool = DEBUG_OPTION,
+    email: bool = EMAIL_OPTION,
 ):
     """
     Run the insights agent to gather and report account metrics.
     """
-    try:
-        asyncio.run(_execute_agent(InsightsAgent, debug, email=email))
-    except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}", exc_info=True)
-        sys.exit(1)
+    from .agents.insights_agent import InsightsAgent
+
+    _run_agent(ctx, InsightsAgent, debug, email=email)
 
 
 @app.command()
 def unfollow(
-    debug: bool = typer.Option(
-        False, "--debug", help="Enable debug logging for detailed output."
-    ),
-    dry_run: bool = typer.Option(
-        False, "--dry-run", help="Simulate actions without making changes."
-    ),
+    ctx: typer.Context,
+    debug: bool = DEBUG_OPTION,
+    dry_run: bool = DRY_RUN_OPTION,
 ):
     """
     Run the unfollow agent to detect who has unfollowed you.
     """
-    _run_agent(UnfollowAgent, debug, dry_run=dry_run)
+    from .agents.unfollow_agent import UnfollowAgent
+
+    _run_agent(ctx, UnfollowAgent, debug, dry_run=dry_run)
 
 
 @app.command()
 def delete(
-    debug: bool = typer.Option(
-        False, "--debug", help="Enable debug logging for detailed output."
-    ),
-    dry_run: bool = typer.Option(
-        False, "--dry-run", help="Simulate actions without making changes."
-    ),
-    email: bool = typer.Option(
-        False, "--email", help="Send the report via email after generation."
-    ),
+    ctx: typer.Context,
+    debug: bool = DEBUG_OPTION,
+    dry_run: bool = DRY_RUN_OPTION,
+    email: bool = EMAIL_OPTION,
     protected_ids: Optional[List[int]] = typer.Option(
         None, "--protected-id", help="Tweet IDs to protect from deletion."
     ),
@@ -179,32 +258,30 @@ def delete(
     """
     Run the delete agent to remove old tweets based on engagement rules.
     """
-    try:
-        asyncio.run(
-            _execute_agent(
-                DeleteAgent,
-                debug,
-                email=email,
-                dry_run=dry_run,
-                protected_ids=protected_ids,
-                archive_path=archive,
-            )
-        )
-    except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}", exc_info=True)
-        sys.exit(1)
+    from .agents.delete_agent import DeleteAgent
+
+    _run_agent(
+        ctx,
+        DeleteAgent,
+        debug,
+        email=email,
+        dry_run=dry_run,
+        protected_ids=protected_ids,
+        archive_path=archive,
+    )
 
 
 @app.command(name="blocked-ids")
 def blocked_ids(
-    debug: bool = typer.Option(
-        False, "--debug", help="Enable debug logging for detailed output."
-    ),
+    ctx: typer.Context,
+    debug: bool = DEBUG_OPTION,
 ):
     """
     Run the blocked-ids agent to fetch and print blocked user IDs.
     """
-    _run_agent(BlockedIdsAgent, debug)
+    from .agents.blocked_ids_agent import BlockedIdsAgent
+
+    _run_agent(ctx, BlockedIdsAgent, debug)
 
 
 def main():
@@ -1,10 +1,11 @@
+from functools import cache, cached_property
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, field_validator
 
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
-        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+        env_file=".env", env_file_encoding="utf-8", extra="ignore", frozen=True
     )
 
     x_api_key: str = Field(..., validation_alias="X_API_KEY")
@@ -14,15 +15,19 @@ class Settings(BaseSettings):
 
     environment: str = Field("development", validation_alias="X_AGENT_ENV")
 
-    @property
-    def normalized_environment(self) -> str:
-        return self.environment.lower().strip()
+    @field_validator("environment")
+    @classmethod
+    def _normalize_environment(cls, value: str) -> str:
+        # Normalized once at load time rather than on every is_dev check
+        return value.lower().strip()
 
-    @property
+    # Settings are never modified after loading, so the derived values below
+    # are computed once instead of on every access.
+    @cached_property
     def is_dev(self) -> bool:
-        return self.normalized_environment == "development"
+        return self.environment == "development"
 
-    @property
+    @cached_property
     def db_name(self) -> str:
         return "insights_dev.db" if self.is_dev else "insights.db"
 
@@ -73,4 +78,23 @@ class Settings(BaseSettings):
             )
 
 
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """Loads the settings on first use and returns the same instance after."""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Stands in for the Settings instance until something reads from it.
+
+    Importing the package must not require credentials: `x-agent --help`
+    has to work without a .env, and a missing variable should surface as
+    the CLI's configuration error rather than an import-time traceback.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
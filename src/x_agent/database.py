@@ -1,42 +1,178 @@
 import sqlite3
+import json
 import logging
-import shutil
+import threading
 import time
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Mapping, Optional
 from contextlib import contextmanager
 from .config import settings
 
 STATE_DIR = Path(".state")
+# Rows handed to each executemany call by the bulk inserts
+INSERT_CHUNK_SIZE = 10_000
+# Deletes at least this large return their free pages to the filesystem
+VACUUM_AFTER_DELETED_ROWS = 1_000
+
+# Per-connection settings, applied once when a connection is opened
+CONNECTION_PRAGMAS = (
+    # Safe with WAL: a crash can lose the last commit but never corrupts the DB
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    # Negative values are in KiB: a 64 MB page cache
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    # Wait up to 30s for another process's write lock instead of failing at 5s
+    "PRAGMA busy_timeout=30000",
+)
+
+# Statements on the hot paths, kept as constants so every call passes the same
+# string and hits the connection's prepared-statement cache.
+# `WHERE true` keeps an upsert from parsing as a join constraint. New rows
+# take the 'PENDING' status from the column default.
+_SQL_ADD_BLOCKED_USERS = """
+    INSERT INTO blocked_users (user_id)
+    SELECT value FROM json_each(?) WHERE true
+    ON CONFLICT(user_id) DO UPDATE SET status = 'PENDING'
+    WHERE blocked_users.status != 'PENDING'
+"""
+_SQL_UPDATE_STATUS = """
+    UPDATE blocked_users
+    SET status = ?, updated_at = (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW'))
+    WHERE user_id IN (SELECT value FROM json_each(?))
+"""
+_SQL_PENDING_IDS_PAGE = """
+    SELECT user_id FROM {table}
+    WHERE status IN ('PENDING', 'FAILED') AND user_id > ?
+    ORDER BY user_id LIMIT ?
+"""
+_SQL_INSIGHTS_AT_OFFSETS = """
+    SELECT offsets.value AS days_ago, insights.* FROM json_each(?) AS offsets
+    JOIN insights ON insights.id = (
+        SELECT id FROM insights
+        WHERE timestamp <= STRFTIME(
+            '%Y-%m-%d %H:%M:%f', 'NOW', '-' || offsets.value || ' days'
+        )
+        ORDER BY timestamp DESC
+        LIMIT 1
+    )
+"""
+
+
+def _json_id_chunks(user_ids: Iterable[int]) -> Iterator[tuple[str]]:
+    """
+    Yields the IDs as JSON arrays of up to INSERT_CHUNK_SIZE elements, each
+    wrapped as a one-parameter row for an `executemany` over `json_each(?)`.
+    """
+    ids = iter(user_ids)
+    while chunk := list(islice(ids, INSERT_CHUNK_SIZE)):
+        yield (json.dumps(chunk),)
 
 
 class DatabaseManager:
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or (STATE_DIR / settings.db_name)
+        self._initialized = False
+        self._dir_ready = False
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Returns this thread's connection, opening it on first use.
+
+        Connections are kept for the lifetime of the manager so that calls
+        share SQLite's page cache instead of re-opening the file every time.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not self._dir_ready:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._dir_ready = True
+            # close() may run on a different thread than the one that opened it.
+            # isolation_level=None leaves transaction control to transaction().
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None
+            )
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """
+        Closes every connection opened by this manager.
+
+        Each connection first runs PRAGMA optimize, which refreshes planner
+        statistics for the tables it queried (as SQLite recommends for
+        short-lived connections), so the pending-status indexes stay in use
+        as the tables grow.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logging.debug(f"Skipped PRAGMA optimize on close: {e}")
+            conn.close()
 
     @contextmanager
-    def transaction(self):
+    def transaction(self, write: bool = False):
         """
         Context manager for database transactions.
-        Ensures the connection is opened, committed, and closed correctly.
+        Ensures the work is committed, or rolled back on error.
+
+        Args:
+            write: If True, take the write lock up front (BEGIN IMMEDIATE)
+                rather than upgrading a read transaction at the first write,
+                which fails with SQLITE_BUSY if another writer got there first.
         """
-        STATE_DIR.mkdir(exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
         try:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
+            conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT leaves the transaction open, while some errors
+            # (e.g. SQLITE_FULL) make SQLite roll back by itself; a ROLLBACK
+            # with no transaction would replace the original error.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
             raise
-        finally:
-            conn.close()
 
     def initialize_database(self) -> None:
-        """Initializes the database using the migration runner."""
+        """
+        Initializes the database using the migration runner.
+
+        Only the first call per manager does any work; later calls return
+        immediately since the schema can't change underneath us mid-process.
+        """
+        if self._initialized:
+            return
         from x_agent.migrations.runner import run_migrations
 
+        conn = self._get_connection()
+        # Lets large deletes hand their pages back with PRAGMA incremental_vacuum
+        # instead of a VACUUM. This only takes effect on a new, empty database;
+        # an existing one is converted once by a VACUUM, which can't change the
+        # setting in WAL mode.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logging.info("Enabling incremental vacuum (one-time database rebuild)...")
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.execute("VACUUM")
+        # WAL is persistent, so this only needs to happen once per database file.
+        # It lets readers proceed during writes and avoids an fsync per commit.
+        # The journal mode can't be changed inside a transaction.
+        conn.execute("PRAGMA journal_mode=WAL")
         run_migrations(self)
+        self._initialized = True
 
     def backup_database(self) -> Optional[str]:
         """
@@ -54,7 +190,13 @@ class DatabaseManager:
         backup_path = backup_dir / backup_name
 
         try:
-            shutil.copy2(self.db_path, backup_path)
+            # SQLite's online backup copies a consistent snapshot, including
+            # pages still in the WAL, in steps so writers can interleave.
+            dest = sqlite3.connect(backup_path)
+            try:
+                self._get_connection().backup(dest, pages=1000, sleep=0.001)
+            finally:
+                dest.close()
             logging.info(f"Database backed up to {backup_path}")
             return str(backup_path)
         except Exception as e:
@@ -69,7 +211,7 @@ class DatabaseManager:
         listed_count: int = 0,
     ) -> None:
         """Adds a new insight record to the database."""
-        with self.transaction() as conn:
+        with self.transaction(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO insights (followers, following, tweet_count, listed_count) VALUES (?, ?, ?, ?)",
@@ -83,42 +225,41 @@ class DatabaseManager:
         """Retrieves the most recent insight from the database."""
         with self.transaction() as conn:
             cursor = conn.cursor()
+            # Plain tuples everywhere else; only the insight reads are accessed by name
+            cursor.row_factory = sqlite3.Row
             cursor.execute(
                 "SELECT * FROM insights ORDER BY timestamp DESC, id DESC LIMIT 1"
             )
             return cursor.fetchone()
 
-    def get_insight_at_offset(self, days_ago: int) -> Optional[sqlite3.Row]:
+    def get_insights_at_offsets(
+        self, days_list: Iterable[int]
+    ) -> dict[int, Optional[sqlite3.Row]]:
         """
-        Retrieves the insight record closest to the specified number of days ago.
+        Retrieves the insight closest to each of the given numbers of days ago.
+
+        All offsets are looked up by a single query; offsets with no insight
+        that old map to None.
         """
+        days_list = list(days_list)
+        insights: dict[int, Optional[sqlite3.Row]] = dict.fromkeys(days_list)
         with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT * FROM insights
-                WHERE timestamp <= STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW', ?)
-                ORDER BY timestamp DESC
-                LIMIT 1
-                """,
-                (f"-{days_ago} days",),
-            )
-            return cursor.fetchone()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(_SQL_INSIGHTS_AT_OFFSETS, (json.dumps(days_list),))
+            for row in cursor:
+                insights[row["days_ago"]] = row
+        return insights
 
     def add_blocked_users(self, user_ids: set[int]) -> None:
         """Adds a set of blocked user IDs to the database."""
         if not user_ids:
             return
-        with self.transaction() as conn:
-            cursor = conn.cursor()
-            data = [(uid, "PENDING") for uid in user_ids]
-            cursor.executemany(
-                """
-                INSERT INTO blocked_users (user_id, status) VALUES (?, ?)
-                ON CONFLICT(user_id) DO UPDATE SET status = 'PENDING'
-                """,
-                data,
-            )
+        # One transaction for the whole set. Each chunk is a single JSON
+        # parameter unpacked by SQLite itself, instead of one bound row per ID,
+        # and memory stays flat no matter how many accounts are blocked.
+        with self.transaction(write=True) as conn:
+            conn.executemany(_SQL_ADD_BLOCKED_USERS, _json_id_chunks(user_ids))
 
     def get_pending_blocked_users(self) -> List[int]:
         """Retrieves all user IDs with status 'PENDING' or 'FAILED'."""
@@ -127,8 +268,49 @@ class DatabaseManager:
             cursor.execute(
                 "SELECT user_id FROM blocked_users WHERE status IN ('PENDING', 'FAILED')"
             )
-            rows = cursor.fetchall()
-            return [row["user_id"] for row in rows]
+            return [uid for (uid,) in cursor]
+
+    def iter_pending_blocked_users(self, chunk_size: int = 500) -> Iterator[List[int]]:
+        """
+        Yields user IDs with status 'PENDING' or 'FAILED' in chunks of `chunk_size`.
+
+        Pages by user_id rather than OFFSET, so rows whose status changes while
+        the caller is consuming earlier chunks never shift later pages.
+        """
+        return self._iter_pending_ids("blocked_users", chunk_size)
+
+    def _iter_pending_ids(self, table: str, chunk_size: int) -> Iterator[List[int]]:
+        # `table` is always one of our own table names, never user input
+        query = _SQL_PENDING_IDS_PAGE.format(table=table)
+        last_id = -1
+        while True:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (last_id, chunk_size))
+                chunk = [uid for (uid,) in cursor]
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            last_id = chunk[-1]
+
+    def get_blocked_users_state(self) -> tuple[int, int]:
+        """
+        Returns (total, pending) counts for the blocked_users table in one query.
+
+        Pending counts users with status 'PENDING' or 'FAILED'.
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(status IN ('PENDING', 'FAILED')), 0)
+                FROM blocked_users
+                """
+            )
+            total, pending = cursor.fetchone()
+            return total, pending
 
     def get_all_blocked_users_count(self) -> int:
         """Returns the total number of users in the blocked_users table."""
@@ -139,41 +321,55 @@ class DatabaseManager:
 
     def clear_pending_blocked_users(self) -> None:
         """Deletes all users with status 'PENDING' from blocked_users table."""
-        with self.transaction() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM blocked_users WHERE status = 'PENDING'")
+        self._clear_pending("blocked_users")
 
     def update_user_status(self, user_id: int, status: str) -> None:
         """Updates the status of a specific user."""
-        with self.transaction() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE blocked_users SET status = ?, updated_at = (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')) WHERE user_id = ?",
-                (status, user_id),
-            )
+        self.update_user_statuses((user_id,), status)
 
-    def update_user_statuses(self, user_ids: List[int], status: str) -> None:
+    def update_user_statuses(self, user_ids: Iterable[int], status: str) -> None:
         """Batch updates the status of multiple users."""
         if not user_ids:
             return
-        with self.transaction() as conn:
+        with self.transaction(write=True) as conn:
+            self._update_statuses(conn.cursor(), user_ids, status)
+
+    def apply_status_updates(self, updates: Mapping[str, Iterable[int]]) -> None:
+        """
+        Batch updates blocked users to several statuses in a single transaction.
+
+        Args:
+            updates: User IDs to update, keyed by their new status.
+        """
+        if not updates:
+            return
+        with self.transaction(write=True) as conn:
             cursor = conn.cursor()
-            data = [(status, uid) for uid in user_ids]
-            cursor.executemany(
-                "UPDATE blocked_users SET status = ?, updated_at = (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')) WHERE user_id = ?",
-                data,
-            )
+            for status, user_ids in updates.items():
+                self._update_statuses(cursor, user_ids, status)
+
+    @staticmethod
+    def _update_statuses(
+        cursor: sqlite3.Cursor, user_ids: Iterable[int], status: str
+    ) -> None:
+        # One UPDATE per chunk of IDs rather than one per ID
+        cursor.executemany(
+            _SQL_UPDATE_STATUS,
+            ((status, ids) for (ids,) in _json_id_chunks(user_ids)),
+        )
 
     def add_following_users(self, user_ids: set[int]) -> None:
         """Adds a set of followed user IDs to the database."""
         if not user_ids:
             return
-        with self.transaction() as conn:
-            cursor = conn.cursor()
-            data = [(uid, "PENDING") for uid in user_ids]
-            cursor.executemany(
-                "INSERT OR IGNORE INTO following_users (user_id, status) VALUES (?, ?)",
-                data,
+        with self.transaction(write=True) as conn:
+            conn.executemany(
+                """
+                INSERT INTO following_users (user_id)
+                SELECT value FROM json_each(?) WHERE true
+                ON CONFLICT(user_id) DO NOTHING
+                """,
+                _json_id_chunks(user_ids),
             )
 
     def get_pending_following_users(self) -> List[int]:
@@ -183,8 +379,16 @@ class DatabaseManager:
             cursor.execute(
                 "SELECT user_id FROM following_users WHERE status IN ('PENDING', 'FAILED')"
             )
-            rows = cursor.fetchall()
-            return [row["user_id"] for row in rows]
+            return [uid for (uid,) in cursor]
+
+    def iter_pending_following_users(
+        self, chunk_size: int = 500
+    ) -> Iterator[List[int]]:
+        """
+        Yields followed user IDs with status 'PENDING' or 'FAILED' in chunks of
+        `chunk_size`, paging by user_id like iter_pending_blocked_users.
+        """
+        return self._iter_pending_ids("following_users", chunk_size)
 
     def get_all_following_users_count(self) -> int:
         """Returns the total number of users in the following_users table."""
@@ -202,36 +406,114 @@ class DatabaseManager:
             )
             return cursor.fetchone()[0]
 
+    def get_following_users_state(self) -> tuple[int, int]:
+        """
+        Returns (total, processed) counts for the following_users table in one
+        query, instead of one scan per count.
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(status != 'PENDING'), 0)
+                FROM following_users
+                """
+            )
+            total, processed = cursor.fetchone()
+            return total, processed
+
     def clear_pending_following_users(self) -> None:
         """Deletes all users with status 'PENDING' from following_users table."""
-        with self.transaction() as conn:
+        self._clear_pending("following_users")
+
+    def _clear_pending(self, table: str) -> None:
+        # `table` is always one of our own table names, never user input
+        with self.transaction(write=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM following_users WHERE status = 'PENDING'")
+            # The redundant IN term lets SQLite match the partial pending index
+            # (it can't infer it from the equality alone) instead of scanning.
+            cursor.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE status = 'PENDING' AND status IN ('PENDING', 'FAILED')
+                """
+            )
+            deleted = cursor.rowcount
+        if deleted >= VACUUM_AFTER_DELETED_ROWS:
+            # Each step of the pragma frees one page; executescript runs it to
+            # completion where execute would stop after the first.
+            self._get_connection().executescript("PRAGMA incremental_vacuum")
 
     def get_all_follower_ids(self) -> set[int]:
         """Retrieves all user IDs from the followers table."""
         with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT user_id FROM followers")
-            rows = cursor.fetchall()
-            return {row["user_id"] for row in rows}
+            return {uid for (uid,) in cursor}
 
     def replace_followers(self, user_ids: set[int]) -> None:
         """Replaces the entire followers table with the given set of IDs."""
-        with self.transaction() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM followers")
-            data = [(uid,) for uid in user_ids]
-            cursor.executemany("INSERT INTO followers (user_id) VALUES (?)", data)
+        with self.transaction(write=True) as conn:
+            self._replace_followers(conn.cursor(), user_ids)
 
-    def log_unfollows(self, user_ids: List[int]) -> None:
+    def log_unfollows(self, user_ids: Iterable[int]) -> None:
         """Logs multiple unfollow events into the unfollows table."""
         if not user_ids:
             return
-        with self.transaction() as conn:
+        with self.transaction(write=True) as conn:
+            self._log_unfollows(conn.cursor(), user_ids)
+
+    def replace_followers_and_log_unfollows(
+        self, user_ids: set[int], unfollowed_ids: Iterable[int]
+    ) -> None:
+        """
+        Replaces the followers table and logs unfollow events atomically,
+        in a single transaction.
+        """
+        with self.transaction(write=True) as conn:
             cursor = conn.cursor()
-            data = [(uid,) for uid in user_ids]
-            cursor.executemany("INSERT INTO unfollows (user_id) VALUES (?)", data)
+            self._replace_followers(cursor, user_ids)
+            if unfollowed_ids:
+                self._log_unfollows(cursor, unfollowed_ids)
+
+    @staticmethod
+    def _replace_followers(cursor: sqlite3.Cursor, user_ids: set[int]) -> None:
+        # Stage the new set and apply only the difference, so a sync where
+        # few followers changed touches only those rows.
+        cursor.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS new_followers (
+                user_id INTEGER PRIMARY KEY
+            )
+            """
+        )
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO new_followers (user_id)
+            SELECT value FROM json_each(?)
+            """,
+            _json_id_chunks(user_ids),
+        )
+        cursor.execute(
+            """
+            DELETE FROM followers
+            WHERE user_id NOT IN (SELECT user_id FROM new_followers)
+            """
+        )
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO followers (user_id)
+            SELECT user_id FROM new_followers
+            """
+        )
+        cursor.execute("DELETE FROM new_followers")
+
+    @staticmethod
+    def _log_unfollows(cursor: sqlite3.Cursor, user_ids: Iterable[int]) -> None:
+        cursor.executemany(
+            "INSERT INTO unfollows (user_id) SELECT value FROM json_each(?)",
+            _json_id_chunks(user_ids),
+        )
 
     def log_deleted_tweet(
         self,
@@ -242,7 +524,7 @@ class DatabaseManager:
         is_response: bool,
     ) -> None:
         """Logs a deleted tweet for audit purposes."""
-        with self.transaction() as conn:
+        with self.transaction(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -273,5 +555,4 @@ class DatabaseManager:
         with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT tweet_id FROM deleted_tweets")
-            rows = cursor.fetchall()
-            return {row["tweet_id"] for row in rows}
+            return {tweet_id for (tweet_id,) in cursor}
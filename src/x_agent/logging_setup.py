@@ -15,8 +15,41 @@ class SingleLineUpdateHandler(logging.StreamHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._last_single_line_length = 0
+        self._specialize()
 
-    def emit(self, record: logging.LogRecord) -> None:
+    def setStream(self, stream):
+        result = super().setStream(stream)
+        self._specialize()
+        return result
+
+    def _specialize(self) -> None:
+        """
+        Picks the emit implementation for the current stream once, instead of
+        checking for a TTY on every record. Line rewriting only makes sense on
+        a terminal; redirected output gets plain lines.
+        """
+        stream = self.stream
+        is_tty = hasattr(stream, "isatty") and stream.isatty()
+        self.emit = self._emit_tty if is_tty else self._emit_plain
+
+    def _emit_plain(self, record: logging.LogRecord) -> None:
+        """
+        Emits a log record as a regular line.
+
+        Args:
+            record: The log record to emit.
+        """
+        try:
+            stream = self.stream
+            if stream is None or (hasattr(stream, "closed") and stream.closed):
+                return
+            stream.write(self.format(record) + "\n")
+            stream.flush()
+        except (ValueError, RuntimeError, AttributeError):
+            # Fallback for closed streams during tests/shutdown
+            pass
+
+    def _emit_tty(self, record: logging.LogRecord) -> None:
         """
         Emits a log record, overwriting the previous line if necessary.
 
@@ -24,45 +57,61 @@ class SingleLineUpdateHandler(logging.StreamHandler):
             record: The log record to emit.
         """
         try:
-            if self.stream is None or (
-                hasattr(self.stream, "closed") and self.stream.closed
-            ):
+            stream = self.stream
+            if stream is None or (hasattr(stream, "closed") and stream.closed):
                 return
 
-            is_tty = hasattr(self.stream, "isatty") and self.stream.isatty()
             message = self.format(record)
 
-            if hasattr(record, "single_line") and is_tty:
-                # Clear the previous line if necessary
-                if self._last_single_line_length > len(message):
-                    print(
-                        "\r" + " " * self._last_single_line_length,
-                        end="\r",
-                        file=self.stream,
-                        flush=True,
-                    )
-                print(f"\r{message}", end="", file=self.stream, flush=True)
+            # Each record is rendered into a single frame so that it costs exactly
+            # one write and one flush, however much clearing it needs.
+            if hasattr(record, "single_line"):
+                # Pad with spaces to erase leftovers of a longer previous line
+                pad = " " * (self._last_single_line_length - len(message))
+                frame = f"\r{message}{pad}"
                 self._last_single_line_length = len(message)
             else:
-                # If a non-single-line record comes, or we're not a TTY
+                prefix = ""
                 if self._last_single_line_length > 0:
-                    if is_tty:
-                        # Clear line and move back to start
-                        print(
-                            "\r" + " " * self._last_single_line_length,
-                            end="\r",
-                            file=self.stream,
-                            flush=True,
-                        )
-                    else:
-                        # Just ensure we start a new line if we were mid-line
-                        print(file=self.stream, flush=True)
+                    # Clear line and move back to start
+                    prefix = "\r" + " " * self._last_single_line_length + "\r"
                     self._last_single_line_length = 0
-                print(message, file=self.stream, flush=True)
+                frame = f"{prefix}{message}\n"
+
+            stream.write(frame)
+            stream.flush()
         except (ValueError, RuntimeError, AttributeError):
             # Fallback for closed streams during tests/shutdown
             pass
 
+    # Replaced per instance by _specialize(); plain lines are the safe default
+    emit = _emit_plain
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """
+    A formatter that renders each second's timestamp only once.
+
+    With a datefmt that has no sub-second fields, every record logged within
+    the same second shares its timestamp, so bursts of progress updates skip
+    the per-record `time.strftime` call.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (whole second, rendered string), replaced as a unit to stay thread-safe
+        self._cached_time = (None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, cached = self._cached_time
+        if second != cached_second:
+            cached = super().formatTime(record, datefmt)
+            self._cached_time = (second, cached)
+        return cached
+
 
 def setup_logging(debug: bool = False) -> None:
     """
@@ -84,7 +133,7 @@ def setup_logging(debug: bool = False) -> None:
         logger.removeHandler(handler)
 
     handler = SingleLineUpdateHandler(sys.stdout)
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
     )
     handler.setFormatter(formatter)
@@ -0,0 +1,4 @@
+# Version of the newest migration in versions/. Bump it with every new
+# migration: run_migrations compares it with the database's user_version to
+# skip discovering and importing the migration modules when nothing is pending.
+LATEST_MIGRATION_VERSION = 6
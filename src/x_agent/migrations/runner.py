@@ -1,40 +1,53 @@
 import logging
+import sqlite3
 import importlib
 import pkgutil
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Type, TYPE_CHECKING
+from typing import List, Tuple, Type, TYPE_CHECKING
 from x_agent.migrations.base import Migration
-from x_agent.migrations import versions
+from x_agent.migrations import LATEST_MIGRATION_VERSION, versions
 
 if TYPE_CHECKING:
     from x_agent.database import DatabaseManager
 
 
-def _ensure_migrations_table(db_manager: "DatabaseManager"):
+def _ensure_migrations_table(cursor: sqlite3.Cursor):
     """Ensures the schema_versions table exists."""
-    with db_manager.transaction() as conn:
-        cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_versions (
+            version INTEGER PRIMARY KEY,
+            applied_at DATETIME DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+            description TEXT
+        )
+    """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS schema_versions (
-                version INTEGER PRIMARY KEY,
-                applied_at DATETIME DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
-                description TEXT
-            )
-        """)
 
-
-def _get_applied_versions(db_manager: "DatabaseManager") -> List[int]:
+def _get_applied_versions(cursor: sqlite3.Cursor) -> List[int]:
     """Returns a list of already applied migration versions."""
+    cursor.execute("SELECT version FROM schema_versions ORDER BY version ASC")
+    return [version for (version,) in cursor]
+
+
+def _get_schema_version(db_manager: "DatabaseManager") -> int:
+    """Returns the latest migration version recorded in the database header."""
     with db_manager.transaction() as conn:
-        cursor = conn.cursor()
+        return conn.execute("PRAGMA user_version").fetchone()[0]
 
-        cursor.execute("SELECT version FROM schema_versions ORDER BY version ASC")
-        return [row["version"] for row in cursor.fetchall()]
 
+def _set_schema_version(cursor: sqlite3.Cursor, version: int) -> None:
+    """Records `version` in the database header (PRAGMA can't take parameters)."""
+    cursor.execute(f"PRAGMA user_version = {int(version)}")
 
-def _get_migration_classes() -> List[Type[Migration]]:
-    """Discovers and returns all Migration subclasses in the versions package."""
+
+@lru_cache(maxsize=1)
+def _get_migration_classes() -> Tuple[Type[Migration], ...]:
+    """
+    Discovers and returns all Migration subclasses in the versions package.
+
+    The set of migrations can't change while the process runs, so discovery
+    happens once and later calls reuse the result.
+    """
     migrations = []
 
     if not versions.__file__:
@@ -53,21 +66,37 @@ def _get_migration_classes() -> List[Type[Migration]]:
             ):
                 migrations.append(attribute)
 
-    return sorted(migrations, key=lambda m: m.version)
+    return tuple(sorted(migrations, key=lambda m: m.version))
 
 
 def run_migrations(db_manager: "DatabaseManager"):
     """
     Executes all pending migrations.
+
+    The latest applied version is also kept in PRAGMA user_version, so a
+    database that is already current is recognized from the file header
+    without querying schema_versions or importing any migration module.
     """
-    _ensure_migrations_table(db_manager)
+    if _get_schema_version(db_manager) >= LATEST_MIGRATION_VERSION:
+        logging.info("Schema is up to date.")
+        return
 
-    applied_versions = _get_applied_versions(db_manager)
     available_migrations = _get_migration_classes()
+    latest_version = available_migrations[-1].version if available_migrations else 0
 
-    pending_migrations = [
-        m for m in available_migrations if m.version not in applied_versions
-    ]
+    # Table check, version lookup and (if nothing is pending) the user_version
+    # backfill share one transaction. Applying migrations needs a second one,
+    # since the backup has to be taken outside any open write transaction.
+    with db_manager.transaction(write=True) as conn:
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        applied_versions = _get_applied_versions(cursor)
+        pending_migrations = [
+            m for m in available_migrations if m.version not in applied_versions
+        ]
+        if not pending_migrations:
+            # Migrated before user_version was tracked; record it for next time
+            _set_schema_version(cursor, latest_version)
 
     if not pending_migrations:
         logging.info("Schema is up to date.")
@@ -77,7 +106,7 @@ def run_migrations(db_manager: "DatabaseManager"):
 
     db_manager.backup_database()
 
-    with db_manager.transaction() as conn:
+    with db_manager.transaction(write=True) as conn:
         cursor = conn.cursor()
 
         for migration_class in pending_migrations:
@@ -88,11 +117,15 @@ def run_migrations(db_manager: "DatabaseManager"):
 
             try:
                 migration.up(cursor)
-                cursor.execute(
-                    "INSERT INTO schema_versions (version, description) VALUES (?, ?)",
-                    (migration.version, migration.description),
-                )
                 logging.info(f"Migration {migration.version} applied successfully.")
             except Exception as e:
                 logging.error(f"Failed to apply migration {migration.version}: {e}")
                 raise
+
+        # Recorded together once every migration is in; the transaction makes
+        # this as atomic as recording them one by one.
+        cursor.executemany(
+            "INSERT INTO schema_versions (version, description) VALUES (?, ?)",
+            ((m.version, m.description) for m in pending_migrations),
+        )
+        _set_schema_version(cursor, latest_version)
@@ -88,8 +88,12 @@ class InitialSchema(Migration):
         if definition not in allowed_definitions:
             raise ValueError(f"Unauthorized definition: {definition}")
 
-        cursor.execute(f"PRAGMA table_info({table})")
-        columns = [row[1] for row in cursor.fetchall()]
-        if column not in columns:
-            logging.info(f"Adding missing column '{column}' to table '{table}'.")
+        # Attempt the ALTER and treat a duplicate column as already present,
+        # rather than listing the table's columns first.
+        try:
             cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+        else:
+            logging.info(f"Added missing column '{column}' to table '{table}'.")
@@ -8,11 +8,13 @@ class AddListedCount(Migration):
     description = "Add listed_count column to insights table."
 
     def up(self, cursor: sqlite3.Cursor) -> None:
-        # Ensure the column exists
-        cursor.execute("PRAGMA table_info(insights)")
-        columns = [row[1] for row in cursor.fetchall()]
-        if "listed_count" not in columns:
-            logging.info("Adding missing column 'listed_count' to table 'insights'.")
+        # Ensure the column exists; a duplicate column means it already does
+        try:
             cursor.execute(
                 "ALTER TABLE insights ADD COLUMN listed_count INTEGER DEFAULT 0"
             )
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+        else:
+            logging.info("Added missing column 'listed_count' to table 'insights'.")
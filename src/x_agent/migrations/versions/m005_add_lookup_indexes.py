@@ -0,0 +1,20 @@
+import sqlite3
+from x_agent.migrations.base import Migration
+
+
+class AddLookupIndexes(Migration):
+    version = 5
+    description = "Add indexes for insight timestamps and pending blocked users."
+
+    def up(self, cursor: sqlite3.Cursor) -> None:
+        # Latest/offset insight lookups order and filter by timestamp
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_insights_timestamp
+            ON insights(timestamp)
+        """)
+        # Only rows still to be processed, in the order the unblock agent reads them
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_blocked_users_pending
+            ON blocked_users(user_id)
+            WHERE status IN ('PENDING', 'FAILED')
+        """)
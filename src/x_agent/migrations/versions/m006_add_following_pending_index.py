@@ -0,0 +1,15 @@
+import sqlite3
+from x_agent.migrations.base import Migration
+
+
+class AddFollowingPendingIndex(Migration):
+    version = 6
+    description = "Add a partial index for pending followed users."
+
+    def up(self, cursor: sqlite3.Cursor) -> None:
+        # Mirrors idx_blocked_users_pending for the following_users queue
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_following_users_pending
+            ON following_users(user_id)
+            WHERE status IN ('PENDING', 'FAILED')
+        """)
@@ -1,7 +1,13 @@
 import sys
+import json
+import time
+import random
 import asyncio
 import logging
+import threading
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
 import tweepy.asynchronous
 import tweepy
 from tenacity import (
@@ -39,14 +45,40 @@ def is_transient_error(exception):
     return False
 
 
+def _header_int(headers, name: str) -> int | None:
+    """
+    Returns a numeric header as an int, or None if it's missing or not a plain
+    number (e.g. an HTTP-date Retry-After), without raising.
+    """
+    value = headers.get(name)
+    return int(value) if value and value.isdigit() else None
+
+
 class XService:
     """
     A service class to encapsulate all interactions with the X (Twitter) API.
     Uses Tweepy AsyncClient (API v2) and v1.1 API for legacy actions.
     """
 
-    def __init__(self) -> None:
-        """Initializes the XService with both async and sync clients."""
+    # Backoff for rate limits that carry no reset header: doubles from the
+    # base on each consecutive one, up to the 15-minute rate-limit window.
+    RATE_LIMIT_BACKOFF_BASE = 60
+    RATE_LIMIT_BACKOFF_MAX = 15 * 60
+    # Rate limits in a row, with no successful call in between, after which
+    # they are raised instead of waited out.
+    MAX_CONSECUTIVE_RATE_LIMITS = 5
+
+    # How long a blocked-IDs checkpoint stays usable
+    CHECKPOINT_MAX_AGE = 24 * 60 * 60
+
+    def __init__(self, blocked_ids_checkpoint: Path | None = None) -> None:
+        """
+        Initializes the XService with both async and sync clients.
+
+        Args:
+            blocked_ids_checkpoint: Optional. Where get_blocked_user_ids saves
+                the progress of a fetch so an interrupted one can resume.
+        """
         self._init_v2_client()
         auth = tweepy.OAuth1UserHandler(
             settings.x_api_key,
@@ -55,9 +87,19 @@ class XService:
             settings.x_access_token_secret,
         )
         self.api_v1 = tweepy.API(auth, wait_on_rate_limit=True)
+        self._auth = auth
+        # Per-thread v1.1 clients for unblocks (see _get_unblock_api)
+        self._unblock_apis = threading.local()
         self.user_id: int | None = None
         self.pinned_tweet_id: int | None = None
+        self.blocked_ids_checkpoint = blocked_ids_checkpoint
         self.v1_lock = asyncio.Lock()
+        # Optional hook so callers can shed concurrency when rate limited
+        self.on_rate_limit: Callable[[], Awaitable[None]] | None = None
+        self._consecutive_rate_limits = 0
+        # When the last v1.1 rate limit hit by an unblock lifts (epoch seconds)
+        self._v1_rate_limit_reset = 0.0
+        self._consecutive_v1_rate_limits = 0
 
     def _init_v2_client(self) -> None:
         """Initializes or re-initializes the v2 AsyncClient."""
@@ -106,13 +148,29 @@ class XService:
         retry=retry_if_exception(is_transient_error),
         reraise=True,
     )
-    async def get_blocked_user_ids(self) -> set[int]:
+    async def get_blocked_user_ids(self, resume: bool = False) -> set[int]:
         """
         Fetches the complete list of blocked user IDs using v1.1 API.
+
+        Args:
+            resume: If True, each page's IDs and next cursor are appended to
+                the blocked_ids_checkpoint file, and an interrupted fetch picks
+                up from there instead of the first page. Ignored when the
+                service has no checkpoint file.
         """
         logging.info("Fetching blocked account IDs via v1.1 API...")
+        resume = resume and self.blocked_ids_checkpoint is not None
         blocked_user_ids = set()
         cursor = -1
+        if resume:
+            checkpoint = await asyncio.to_thread(self._load_blocked_ids_checkpoint)
+            if checkpoint:
+                cursor, blocked_user_ids = checkpoint
+                logging.info(
+                    f"Resuming from a saved cursor with {len(blocked_user_ids)} IDs."
+                )
+            else:
+                await asyncio.to_thread(self._start_blocked_ids_checkpoint)
 
         try:
             while cursor != 0:
@@ -125,6 +183,10 @@ class XService:
                     )
                 blocked_user_ids.update(ids)
                 cursor = next_cursor
+                if resume and cursor != 0:
+                    await asyncio.to_thread(
+                        self._append_blocked_ids_checkpoint, cursor, ids
+                    )
                 if len(blocked_user_ids) % 1000 == 0 or cursor == 0:
                     logging.info(
                         f"Fetched {len(blocked_user_ids)} IDs...",
@@ -136,11 +198,53 @@ class XService:
                 logging.error(f"Error fetching blocked IDs: {e}", exc_info=True)
             raise
 
+        if resume:
+            await asyncio.to_thread(self.blocked_ids_checkpoint.unlink, missing_ok=True)
         logging.info(
             f"Finished fetching. Found a total of {len(blocked_user_ids)} blocked account IDs."
         )
         return blocked_user_ids
 
+    def _load_blocked_ids_checkpoint(self) -> tuple[int, set[int]] | None:
+        """
+        Returns the saved (cursor, IDs) of an interrupted fetch for this account,
+        or None if there is none, it is stale, or it can't be read.
+
+        The file holds a header line with the account's user ID, then one line
+        per fetched page with its IDs and the cursor of the next page.
+        """
+        path = self.blocked_ids_checkpoint
+        cursor, ids = None, set()
+        try:
+            if time.time() - path.stat().st_mtime > self.CHECKPOINT_MAX_AGE:
+                return None
+            with path.open() as f:
+                if json.loads(f.readline())["user_id"] != self.user_id:
+                    return None
+                for line in f:
+                    try:
+                        page = json.loads(line)
+                    except ValueError:
+                        # Torn last line of an interrupted append; that page is
+                        # fetched again from the previous cursor.
+                        break
+                    cursor = page["cursor"]
+                    ids.update(page["ids"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return (cursor, ids) if cursor is not None else None
+
+    def _start_blocked_ids_checkpoint(self) -> None:
+        """Starts a new checkpoint for this account, replacing any old one."""
+        path = self.blocked_ids_checkpoint
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"user_id": self.user_id}) + "\n")
+
+    def _append_blocked_ids_checkpoint(self, cursor: int, ids: list[int]) -> None:
+        """Records one fetched page, so each page is written exactly once."""
+        with self.blocked_ids_checkpoint.open("a") as f:
+            f.write(json.dumps({"cursor": cursor, "ids": ids}) + "\n")
+
     async def _check_user_exists_v1(self, user_id: int) -> bool | None:
         """Checks if a user exists and is active using v1.1 API."""
         try:
@@ -238,8 +342,7 @@ class XService:
         Returns "SUCCESS", "NOT_FOUND", or "FAILED".
         """
         try:
-            async with self.v1_lock:
-                await asyncio.to_thread(self.api_v1.destroy_block, user_id=user_id)
+            await self._destroy_block(user_id)
             return "SUCCESS"
         except tweepy.errors.NotFound as e:
             # They might exist but the block relationship is glitched
@@ -257,12 +360,81 @@ class XService:
                 return "FAILED"
 
             return await self._handle_zombie_recovery(user_id)
+        except tweepy.errors.TooManyRequests:
+            raise  # Out of rate-limit retries; stop the run, IDs stay pending
         except Exception as e:
             if is_transient_error(e):
                 raise  # Reraise to let tenacity handle it
             logging.warning(f"Failed to unblock {user_id}: {e}")
             return "FAILED"
 
+    async def _destroy_block(self, user_id: int) -> None:
+        """Unblocks a user via v1.1, waiting out and retrying rate limits."""
+        while True:
+            try:
+                # Not serialized by v1_lock: unlike the paginated fetches,
+                # unblocks share no cursor state, so workers can overlap them.
+                # Each thread uses its own client rather than sharing api_v1.
+                await asyncio.to_thread(
+                    lambda: self._get_unblock_api().destroy_block(user_id=user_id)
+                )
+                self._consecutive_v1_rate_limits = 0
+                return
+            except tweepy.errors.TooManyRequests as e:
+                await self._handle_v1_rate_limit(e)
+
+    def _get_unblock_api(self) -> tweepy.API:
+        """
+        Returns this thread's v1.1 client for unblocks, creating it on first use.
+
+        A tweepy.API holds a single requests.Session, which isn't documented as
+        thread-safe, so unblocks running in parallel threads don't share one.
+        They also surface rate limits instead of sleeping in the thread, so
+        the caller can shed concurrency.
+        """
+        api = getattr(self._unblock_apis, "api", None)
+        if api is None:
+            api = tweepy.API(self._auth, wait_on_rate_limit=False)
+            self._unblock_apis.api = api
+        return api
+
+    async def _handle_v1_rate_limit(
+        self, exception: tweepy.errors.TooManyRequests
+    ) -> None:
+        """
+        Sleeps until a v1.1 rate limit hit by an unblock resets.
+
+        Concurrent unblocks tend to hit the same limit together, so only the
+        first one to see it counts it and calls on_rate_limit; the rest just
+        wait it out. As on the v2 path, the exception is raised instead once
+        MAX_CONSECUTIVE_RATE_LIMITS limits pass without a successful unblock.
+        """
+        now = time.time()
+        already_limited = now < self._v1_rate_limit_reset
+        if not already_limited:
+            self._consecutive_v1_rate_limits += 1
+        if self._consecutive_v1_rate_limits > self.MAX_CONSECUTIVE_RATE_LIMITS:
+            logging.error(
+                f"Rate limited {self.MAX_CONSECUTIVE_RATE_LIMITS} times in a row "
+                "without a successful unblock. Giving up."
+            )
+            raise exception
+        reset_at = _header_int(exception.response.headers, "x-rate-limit-reset")
+        if reset_at is None:
+            reset_at = now + self._next_rate_limit_backoff(
+                self._consecutive_v1_rate_limits
+            )
+        self._v1_rate_limit_reset = max(self._v1_rate_limit_reset, reset_at)
+        if self.on_rate_limit and not already_limited:
+            await self.on_rate_limit()
+
+        # Add a small buffer of 5 seconds
+        wait_seconds = max(0, reset_at - now) + 5
+        logging.warning(
+            f"Rate limit hit (v1). Sleeping for {wait_seconds:.0f} seconds..."
+        )
+        await asyncio.sleep(wait_seconds)
+
     async def get_me(self) -> tweepy.Response:
         """Retrieves the authenticated user's information."""
         return await self.client.get_me(
@@ -346,21 +518,38 @@ class XService:
     async def _handle_v2_rate_limit(
         self, exception: tweepy.errors.TooManyRequests
     ) -> None:
-        """Handles v2 rate limits by sleeping until the reset time or Retry-After."""
+        """
+        Handles v2 rate limits by sleeping until the reset time or Retry-After.
+
+        Raises the exception instead once MAX_CONSECUTIVE_RATE_LIMITS limits
+        have been waited out without a successful call, so a limit that never
+        lifts can't keep the caller looping forever.
+        """
+        self._consecutive_rate_limits += 1
+        if self._consecutive_rate_limits > self.MAX_CONSECUTIVE_RATE_LIMITS:
+            logging.error(
+                f"Rate limited {self.MAX_CONSECUTIVE_RATE_LIMITS} times in a row "
+                "without a successful request. Giving up."
+            )
+            raise exception
+
+        if self.on_rate_limit:
+            await self.on_rate_limit()
+
         headers = exception.response.headers
         logging.warning(f"RATE LIMIT HEADERS: {dict(headers)}")
 
         # Check for Daily Limits (Common on Free Tier)
         app_remaining = headers.get("x-app-limit-24hour-remaining")
         user_remaining = headers.get("x-user-limit-24hour-remaining")
-        app_reset = headers.get("x-app-limit-24hour-reset")
-        user_reset = headers.get("x-user-limit-24hour-reset")
+        app_reset = _header_int(headers, "x-app-limit-24hour-reset")
+        user_reset = _header_int(headers, "x-user-limit-24hour-reset")
 
         daily_reset_ts = None
         if app_remaining == "0" and app_reset:
-            daily_reset_ts = int(app_reset)
+            daily_reset_ts = app_reset
         elif user_remaining == "0" and user_reset:
-            daily_reset_ts = int(user_reset)
+            daily_reset_ts = user_reset
 
         if daily_reset_ts:
             reset_time = datetime.fromtimestamp(daily_reset_ts, tz=timezone.utc)
@@ -376,11 +565,11 @@ class XService:
             return
 
         # Fallback to standard 15-minute limits
-        reset_at = headers.get("x-rate-limit-reset")
-        retry_after = headers.get("retry-after")
+        reset_at = _header_int(headers, "x-rate-limit-reset")
+        retry_after = _header_int(headers, "retry-after")
 
         if reset_at:
-            reset_time = datetime.fromtimestamp(int(reset_at), tz=timezone.utc)
+            reset_time = datetime.fromtimestamp(reset_at, tz=timezone.utc)
             # Add a small buffer of 5 seconds
             wait_seconds = (reset_time - datetime.now(timezone.utc)).total_seconds() + 5
             if wait_seconds > 0:
@@ -396,20 +585,33 @@ class XService:
                 )
                 logging.warning("Sleeping for 30 minutes as backoff...")
                 await asyncio.sleep(1801)
-        elif retry_after:
-            wait_seconds = int(retry_after) + 5
+        elif retry_after is not None:
+            wait_seconds = retry_after + 5
             logging.warning(
                 f"Rate limit hit (v2). Retry-After: {retry_after}s. Sleeping for {wait_seconds}s..."
             )
             await asyncio.sleep(wait_seconds)
         else:
+            wait_seconds = self._next_rate_limit_backoff(self._consecutive_rate_limits)
             logging.warning(
-                "Rate limit hit (v2). No reset header. Sleeping for 15 minutes..."
+                f"Rate limit hit (v2). No reset header. Sleeping for {wait_seconds:.0f}s..."
             )
-            await asyncio.sleep(901)
+            await asyncio.sleep(wait_seconds)
 
         await self._recreate_v2_client()
 
+    def _next_rate_limit_backoff(self, consecutive: int) -> float:
+        """
+        Returns the wait for the `consecutive`-th rate limit in a row without a
+        reset header, with up to 10% jitter so retries after a shared limit
+        don't all land at once.
+        """
+        wait_seconds = min(
+            self.RATE_LIMIT_BACKOFF_MAX,
+            self.RATE_LIMIT_BACKOFF_BASE * 2 ** (consecutive - 1),
+        )
+        return wait_seconds + random.uniform(0, wait_seconds * 0.1)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -430,6 +632,7 @@ class XService:
             chunk = user_ids[i : i + 100]
             try:
                 response = await self.client.get_users(ids=chunk)
+                self._consecutive_rate_limits = 0
                 if response.data:
                     all_users.extend(response.data)
                 i += 100
@@ -506,13 +709,15 @@ class XService:
         """
         while True:
             try:
-                return await self.client.get_users_tweets(
+                response = await self.client.get_users_tweets(
                     id=user_id,
                     max_results=100,
                     pagination_token=pagination_token,
                     tweet_fields=["public_metrics", "created_at", "referenced_tweets"],
                     exclude=["retweets"],
                 )
+                self._consecutive_rate_limits = 0
+                return response
             except tweepy.errors.TooManyRequests as e:
                 await self._handle_v2_rate_limit(e)
             except Exception as e:
@@ -537,6 +742,7 @@ class XService:
         while True:
             try:
                 response = await self.client.delete_tweet(id=tweet_id)
+                self._consecutive_rate_limits = 0
                 if response.data:
                     return response.data.get("deleted", False)
                 return False
@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+
 import pytest
 from typer.testing import CliRunner
 from unittest.mock import patch, AsyncMock
@@ -8,7 +12,7 @@ runner = CliRunner()
 
 @pytest.fixture
 def mock_x_service():
-    with patch("x_agent.cli.XService") as mock:
+    with patch("x_agent.services.x_service.XService") as mock:
         mock_instance = mock.return_value
         mock_instance.initialize = AsyncMock()
         mock_instance.get_me = AsyncMock()
@@ -27,9 +31,9 @@ def mock_db_manager():
 @pytest.fixture
 def mock_agents():
     with (
-        patch("x_agent.cli.UnblockAgent") as mock_unblock,
-        patch("x_agent.cli.InsightsAgent") as mock_insights,
-        patch("x_agent.cli.BlockedIdsAgent") as mock_blocked_ids,
+        patch("x_agent.agents.unblock_agent.UnblockAgent") as mock_unblock,
+        patch("x_agent.agents.insights_agent.InsightsAgent") as mock_insights,
+        patch("x_agent.agents.blocked_ids_agent.BlockedIdsAgent") as mock_blocked_ids,
     ):
         yield mock_unblock, mock_insights, mock_blocked_ids
 
@@ -48,6 +52,7 @@ def test_unblock_command(mock_x_service, mock_db_manager, mock_agents):
             dry_run=False,
             user_id=None,
             refresh=False,
+            concurrency=None,
         )
 
 
@@ -65,9 +70,24 @@ def test_unblock_command_with_user_id(mock_x_service, mock_db_manager, mock_agen
             dry_run=False,
             user_id=12345,
             refresh=False,
+            concurrency=None,
         )
 
 
+def test_unblock_command_with_concurrency(mock_x_service, mock_db_manager, mock_agents):
+    mock_unblock_cls, _, _ = mock_agents
+    mock_unblock_instance = mock_unblock_cls.return_value
+
+    with patch.object(mock_unblock_instance, "execute", new_callable=AsyncMock):
+        result = runner.invoke(app, ["unblock", "--concurrency", "5"])
+
+        assert result.exit_code == 0
+        assert mock_unblock_cls.call_args.kwargs["concurrency"] == 5
+
+    result = runner.invoke(app, ["unblock", "--concurrency", "0"])
+    assert result.exit_code != 0
+
+
 def test_insights_command(mock_x_service, mock_db_manager, mock_agents):
     _, mock_insights_cls, _ = mock_agents
     mock_insights_instance = mock_insights_cls.return_value
@@ -94,12 +114,12 @@ def test_blocked_ids_command(mock_x_service, mock_db_manager, mock_agents):
 
         assert result.exit_code == 0
         mock_blocked_ids_cls.assert_called_once_with(
-            mock_x_service.return_value, mock_db_manager.return_value, dry_run=False
+            mock_x_service.return_value, mock_db_manager.return_value
         )
 
 
 def test_unfollow_command(mock_x_service, mock_db_manager, mock_agents):
-    with patch("x_agent.cli.UnfollowAgent") as mock_unfollow_cls:
+    with patch("x_agent.agents.unfollow_agent.UnfollowAgent") as mock_unfollow_cls:
         mock_unfollow_instance = mock_unfollow_cls.return_value
         with patch.object(mock_unfollow_instance, "execute", new_callable=AsyncMock):
             result = runner.invoke(app, ["unfollow"])
@@ -128,3 +148,51 @@ def test_cli_config_error(mock_x_service, mock_db_manager):
 
         assert result.exit_code == 1
         assert "Configuration Error: Missing X_API_KEY" in result.output
+
+
+def test_db_info_does_not_build_x_service(mock_x_service, mock_db_manager):
+    result = runner.invoke(app, ["db", "info"])
+
+    assert result.exit_code == 0
+    mock_x_service.assert_not_called()
+    # The callback and the command share one DatabaseManager
+    mock_db_manager.assert_called_once_with()
+
+
+def test_help_skips_config_check(mock_x_service, mock_db_manager):
+    """Subcommand help must work even without a valid configuration."""
+    with patch("x_agent.cli.settings") as mock_settings:
+        mock_settings.check_config.side_effect = ValueError("Missing X_API_KEY")
+
+        result = runner.invoke(app, ["insights", "--help"])
+
+        assert result.exit_code == 0
+        assert "Configuration Error" not in result.output
+        mock_settings.check_config.assert_not_called()
+
+
+@pytest.mark.parametrize("args", [["--help"], ["unblock", "--help"]])
+def test_help_works_without_credentials(tmp_path, args):
+    """A fresh process with no .env and no X_* variables can still show help."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("X_")}
+
+    result = subprocess.run(
+        [sys.executable, "-c", "from x_agent.cli import app; app()", *args],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Usage" in result.stdout
+
+
+def test_db_backup_closes_database_on_failure(mock_db_manager):
+    db_manager = mock_db_manager.return_value
+    db_manager.backup_database.side_effect = RuntimeError("disk full")
+
+    result = runner.invoke(app, ["db", "backup"])
+
+    assert isinstance(result.exception, RuntimeError)
+    db_manager.close.assert_called_once_with()
@@ -30,6 +30,18 @@ def test_settings_prod_env(monkeypatch):
     assert settings.db_name == "insights.db"
 
 
+def test_settings_env_is_normalized():
+    settings = Settings(
+        x_api_key="k",
+        x_api_key_secret="ks",
+        x_access_token="t",
+        x_access_token_secret="ts",
+        environment=" Development ",
+    )
+    assert settings.environment == "development"
+    assert settings.is_dev is True
+
+
 def test_check_config_success():
     settings = Settings(
         x_api_key="k",
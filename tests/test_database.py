@@ -35,6 +35,94 @@ def test_initialize_database(db_manager, test_db_path):
     conn.close()
 
 
+def test_connection_pragmas(db_manager):
+    db_manager.initialize_database()
+    with db_manager.transaction() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+
+
+def test_transaction_rolls_back_on_error(db_manager):
+    db_manager.initialize_database()
+    with pytest.raises(RuntimeError):
+        with db_manager.transaction() as conn:
+            conn.execute("INSERT INTO blocked_users (user_id) VALUES (1)")
+            raise RuntimeError("boom")
+
+    assert db_manager.get_all_blocked_users_count() == 0
+    # The connection is reusable for the next transaction
+    db_manager.add_blocked_users({2})
+    assert db_manager.get_all_blocked_users_count() == 1
+
+
+def _defer_foreign_key_violation(db_manager):
+    """Sets up a table whose inserts make the next COMMIT fail."""
+    conn = db_manager._get_connection()
+    # foreign_keys can't be changed inside a transaction
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("CREATE TABLE IF NOT EXISTS parent (id INTEGER PRIMARY KEY)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS child (parent_id INTEGER "
+        "REFERENCES parent (id) DEFERRABLE INITIALLY DEFERRED)"
+    )
+
+
+def test_transaction_rolls_back_failed_commit(db_manager):
+    db_manager.initialize_database()
+    _defer_foreign_key_violation(db_manager)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with db_manager.transaction() as conn:
+            conn.execute("INSERT INTO child (parent_id) VALUES (1)")
+
+    with db_manager.transaction() as conn:
+        # The failed transaction was rolled back rather than left open
+        assert not conn.execute("SELECT * FROM child").fetchall()
+
+
+def test_transaction_keeps_error_when_sqlite_already_rolled_back(db_manager):
+    db_manager.initialize_database()
+    with pytest.raises(RuntimeError, match="boom"):
+        with db_manager.transaction() as conn:
+            # Stands in for SQLite aborting the transaction on its own
+            conn.execute("ROLLBACK")
+            raise RuntimeError("boom")
+
+
+def test_write_transaction_takes_lock_up_front(db_manager, test_db_path):
+    db_manager.initialize_database()
+    other = sqlite3.connect(test_db_path, timeout=0)
+    try:
+        with db_manager.transaction(write=True):
+            # No statement has run yet, but the write lock is already held
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("BEGIN IMMEDIATE")
+    finally:
+        other.close()
+
+
+def test_failed_write_commit_releases_the_lock(db_manager, test_db_path):
+    db_manager.initialize_database()
+    _defer_foreign_key_violation(db_manager)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with db_manager.transaction(write=True) as conn:
+            conn.execute("INSERT INTO child (parent_id) VALUES (1)")
+
+    other = sqlite3.connect(test_db_path, timeout=0)
+    try:
+        # The BEGIN IMMEDIATE lock went with the rollback
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("ROLLBACK")
+    finally:
+        other.close()
+    db_manager.add_blocked_users({1})
+    assert db_manager.get_all_blocked_users_count() == 1
+
+
 def test_backup_database(db_manager, test_db_path, tmp_path):
     # We need to ensure STATE_DIR points to tmp_path or similar for backup destination
     # But STATE_DIR is a global in database.py.
@@ -49,6 +137,97 @@ def test_backup_database(db_manager, test_db_path, tmp_path):
         assert Path(backup_path).name.startswith("test_insights_")
 
 
+def test_initialize_database_runs_once(db_manager):
+    with patch("x_agent.migrations.runner.run_migrations") as mock_run:
+        db_manager.initialize_database()
+        db_manager.initialize_database()
+    mock_run.assert_called_once_with(db_manager)
+
+
+def test_backup_includes_uncheckpointed_writes(db_manager, tmp_path):
+    with patch("x_agent.database.STATE_DIR", tmp_path):
+        db_manager.initialize_database()
+        db_manager.add_blocked_users({1, 2})
+        backup_path = db_manager.backup_database()
+
+    conn = sqlite3.connect(backup_path)
+    assert conn.execute("SELECT COUNT(*) FROM blocked_users").fetchone()[0] == 2
+    conn.close()
+
+
+def test_creates_the_database_directory(tmp_path):
+    db_path = tmp_path / "nested" / "test.db"
+
+    DatabaseManager(db_path=db_path).initialize_database()
+    assert db_path.exists()
+
+
+def test_close_reopens_on_next_use(db_manager):
+    db_manager.initialize_database()
+    db_manager.add_blocked_users({1})
+    db_manager.close()
+
+    assert db_manager.get_all_blocked_users_count() == 1
+
+
+def test_close_refreshes_planner_statistics(db_manager, test_db_path):
+    db_manager.initialize_database()
+    db_manager.add_blocked_users(set(range(1000)))
+    list(db_manager.iter_pending_blocked_users())
+    db_manager.close()
+
+    conn = sqlite3.connect(test_db_path)
+    tables = conn.execute(
+        "SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchall()
+    conn.close()
+    assert tables == [("sqlite_stat1",)]
+
+
+def test_clear_pending_releases_free_pages(db_manager):
+    db_manager.initialize_database()
+    db_manager.add_blocked_users(set(range(5000)))
+
+    db_manager.clear_pending_blocked_users()
+    with db_manager.transaction() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    assert db_manager.get_all_blocked_users_count() == 0
+
+
+def test_existing_database_is_converted_to_incremental_vacuum(db_manager, test_db_path):
+    # A database created before auto_vacuum was set, already in WAL mode
+    conn = sqlite3.connect(test_db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE legacy (id INTEGER)")
+    conn.execute("INSERT INTO legacy VALUES (1)")
+    conn.commit()
+    conn.close()
+
+    db_manager.initialize_database()
+
+    with db_manager.transaction() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT id FROM legacy").fetchall() == [(1,)]
+
+
+def test_get_insights_at_offsets(db_manager):
+    db_manager.initialize_database()
+    db_manager.add_insight(90, 40)
+    db_manager.add_insight(100, 50)
+    with db_manager.transaction() as conn:
+        conn.execute(
+            "UPDATE insights SET timestamp = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW', "
+            "'-8 days') WHERE followers = 90"
+        )
+
+    insights = db_manager.get_insights_at_offsets([0, 7, 30])
+    assert insights[0]["followers"] == 100
+    assert insights[7]["followers"] == 90
+    assert insights[30] is None
+
+
 def test_blocked_users_operations(db_manager):
     db_manager.initialize_database()
 
@@ -57,6 +236,56 @@ def test_blocked_users_operations(db_manager):
     db_manager.add_blocked_users(user_ids)
     assert db_manager.get_all_blocked_users_count() == 3
     assert len(db_manager.get_pending_blocked_users()) == 3
+    assert db_manager.get_blocked_users_state() == (3, 3)
+    db_manager.update_user_statuses([101], "UNBLOCKED")
+    assert db_manager.get_blocked_users_state() == (3, 2)
+    db_manager.apply_status_updates({"NOT_FOUND": [102], "FAILED": [103]})
+    assert db_manager.get_pending_blocked_users() == [103]
+
+
+def test_add_blocked_users_requeues_only_processed_rows(db_manager):
+    db_manager.initialize_database()
+    db_manager.add_blocked_users({1, 2})
+    db_manager.update_user_statuses([1], "UNBLOCKED")
+
+    with db_manager.transaction() as conn:
+        before = conn.total_changes
+    db_manager.add_blocked_users({1, 2})
+    with db_manager.transaction() as conn:
+        # Only user 1 is rewritten; user 2 is already pending
+        assert conn.total_changes - before == 1
+    assert db_manager.get_blocked_users_state() == (2, 2)
+
+
+def test_add_blocked_users_in_chunks(db_manager, monkeypatch):
+    monkeypatch.setattr("x_agent.database.INSERT_CHUNK_SIZE", 2)
+    db_manager.initialize_database()
+
+    db_manager.add_blocked_users({1, 2, 3, 4, 5})
+    assert db_manager.get_blocked_users_state() == (5, 5)
+
+
+def test_following_users_state(db_manager):
+    db_manager.initialize_database()
+    assert db_manager.get_following_users_state() == (0, 0)
+
+    db_manager.add_following_users({1, 2, 3})
+    with db_manager.transaction() as conn:
+        conn.execute("UPDATE following_users SET status = 'FAILED' WHERE user_id = 1")
+    assert db_manager.get_following_users_state() == (3, 1)
+    assert db_manager.get_all_following_users_count() == 3
+    assert db_manager.get_processed_following_count() == 1
+
+
+def test_iter_pending_blocked_users_chunks(db_manager):
+    db_manager.initialize_database()
+    db_manager.add_blocked_users({1, 2, 3, 4, 5})
+
+    chunks = db_manager.iter_pending_blocked_users(chunk_size=2)
+    assert next(chunks) == [1, 2]
+    # Status changes made while iterating must not shift later chunks
+    db_manager.update_user_statuses([1, 2], "UNBLOCKED")
+    assert list(chunks) == [[3, 4], [5]]
 
 
 def test_insights_operations(db_manager):
@@ -69,3 +298,42 @@ def test_insights_operations(db_manager):
     assert latest is not None
     assert latest["followers"] == 110
     assert latest["following"] == 55
+
+
+def test_iter_pending_following_users_chunks(db_manager):
+    db_manager.initialize_database()
+    db_manager.add_following_users({1, 2, 3})
+
+    assert list(db_manager.iter_pending_following_users(chunk_size=2)) == [
+        [1, 2],
+        [3],
+    ]
+
+
+def test_replace_followers_applies_difference(db_manager):
+    db_manager.initialize_database()
+    db_manager.replace_followers({1, 2, 3})
+    with db_manager.transaction() as conn:
+        conn.execute("UPDATE followers SET updated_at = 'kept' WHERE user_id = 2")
+
+    db_manager.replace_followers({2, 4})
+    assert db_manager.get_all_follower_ids() == {2, 4}
+    with db_manager.transaction() as conn:
+        row = conn.execute("SELECT updated_at FROM followers WHERE user_id = 2")
+        # Unchanged followers are left in place rather than re-inserted
+        assert row.fetchone() == ("kept",)
+
+    db_manager.replace_followers(set())
+    assert db_manager.get_all_follower_ids() == set()
+
+
+def test_replace_followers_and_log_unfollows(db_manager):
+    db_manager.initialize_database()
+    db_manager.replace_followers({1, 2, 3})
+
+    db_manager.replace_followers_and_log_unfollows({2, 3, 4}, {1})
+
+    assert db_manager.get_all_follower_ids() == {2, 3, 4}
+    with db_manager.transaction() as conn:
+        rows = conn.execute("SELECT user_id FROM unfollows").fetchall()
+    assert rows == [(1,)]
@@ -1,9 +1,9 @@
 import pytest
 import json
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 from pathlib import Path
-from x_agent.agents.delete_agent import DeleteAgent, MockStatus
+from x_agent.agents.delete_agent import DeleteAgent, MockStatus, iter_archive_batches
 from x_agent.services.x_service import XService
 from x_agent.database import DatabaseManager
 
@@ -74,3 +74,71 @@ def test_mock_status_initialization():
     assert status.entities == {"hashtags": []}
     assert status.extended_entities == {}
     assert status.in_reply_to_status_id is None
+
+
+@pytest.mark.asyncio
+async def test_process_archive_missing_file(mock_x_service, mock_db_manager, tmp_path):
+    agent = DeleteAgent(
+        x_service=mock_x_service,
+        db_manager=mock_db_manager,
+        dry_run=True,
+        archive_path=str(tmp_path / "missing.js"),
+    )
+    agent._process_tweet = AsyncMock()
+
+    await agent._process_archive(datetime.now(timezone.utc))
+
+    agent._process_tweet.assert_not_called()
+
+
+def test_iter_archive_batches_small_reads(tmp_path):
+    entries = [{"tweet": {"id": str(i), "full_text": "x" * i}} for i in range(1, 6)]
+    archive_file = tmp_path / "tweets.js"
+    archive_file.write_text(
+        "window.YTD.tweets.part0 = " + json.dumps(entries, indent=2)
+    )
+
+    # Reads far smaller than one entry force entries to span several blocks
+    batches = list(iter_archive_batches(archive_file, read_size=7))
+
+    assert [e for batch in batches for e in batch] == entries
+
+
+def test_iter_archive_batches_truncated(tmp_path):
+    archive_file = tmp_path / "tweets.js"
+    archive_file.write_text('window.YTD.tweets.part0 = [{"tweet": {"id": "1"}}, {"tw')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_archive_batches(archive_file, read_size=16))
+
+
+def _write_old_tweets_archive(tmp_path, truncate=False):
+    entries = [
+        {"tweet": {"id": str(i), "created_at": "Wed Oct 24 10:00:00 +0000 2018"}}
+        for i in range(1, 4)
+    ]
+    content = "window.YTD.tweets.part0 = " + json.dumps(entries)
+    archive_file = tmp_path / "tweets.js"
+    # Cut off inside the last entry, after several complete ones
+    archive_file.write_text(content[:-10] if truncate else content)
+    return archive_file
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("truncate, deletions", [(False, 3), (True, 0)])
+async def test_process_archive_deletes_only_once_fully_decoded(
+    mock_x_service, mock_db_manager, tmp_path, truncate, deletions
+):
+    mock_x_service.delete_tweet = AsyncMock(return_value=True)
+    mock_db_manager.log_deleted_tweet = MagicMock()
+    agent = DeleteAgent(
+        x_service=mock_x_service,
+        db_manager=mock_db_manager,
+        dry_run=False,
+        archive_path=str(_write_old_tweets_archive(tmp_path, truncate)),
+    )
+
+    with patch("x_agent.agents.delete_agent.asyncio.sleep", AsyncMock()):
+        await agent._process_archive(datetime.now(timezone.utc))
+
+    assert mock_x_service.delete_tweet.await_count == deletions
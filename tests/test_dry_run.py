@@ -13,6 +13,7 @@ def mock_x_service():
     service.ensure_initialized = AsyncMock()
     service.get_blocked_user_ids = AsyncMock(return_value={101, 102})
     service.get_follower_user_ids = AsyncMock(return_value={201, 202})
+    service.on_rate_limit = None
     service.unblock_user = AsyncMock(return_value="SUCCESS")
     service.unfollow_user = AsyncMock(return_value="SUCCESS")
     return service
@@ -28,8 +29,8 @@ def mock_db_manager():
 @pytest.mark.asyncio
 async def test_unblock_agent_dry_run(mock_x_service, mock_db_manager, caplog):
     # Setup DB to return some pending users
-    mock_db_manager.get_all_blocked_users_count.return_value = 2
-    mock_db_manager.get_pending_blocked_users.return_value = [101, 102]
+    mock_db_manager.get_blocked_users_state.return_value = (2, 2)
+    mock_db_manager.iter_pending_blocked_users.return_value = iter([[101, 102]])
 
     agent = UnblockAgent(
         x_service=mock_x_service, db_manager=mock_db_manager, dry_run=True
@@ -48,6 +49,7 @@ async def test_unblock_agent_dry_run(mock_x_service, mock_db_manager, caplog):
 
     # Verify no DB update calls were made
     assert not mock_db_manager.update_user_statuses.called
+    assert not mock_db_manager.apply_status_updates.called
     assert not mock_db_manager.update_user_status.called
 
 
@@ -68,6 +70,7 @@ async def test_unfollow_agent_dry_run(mock_x_service, mock_db_manager, caplog, c
     # Verify no destructive calls to DB
     mock_db_manager.replace_followers.assert_not_called()
     mock_db_manager.log_unfollows.assert_not_called()
+    mock_db_manager.replace_followers_and_log_unfollows.assert_not_called()
 
     # Verify logs
     assert "[Dry Run] Would update follower list in database." in caplog.text
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import tweepy
 from unittest.mock import MagicMock, AsyncMock
@@ -20,8 +21,8 @@ def mock_x_service():
 @pytest.fixture
 def mock_db_manager():
     mock_db = MagicMock(spec=DatabaseManager)
-    # Default offset returns to None to avoid MagicMock comparison errors
-    mock_db.get_insight_at_offset.return_value = None
+    # No offset insights by default, to avoid MagicMock comparison errors
+    mock_db.get_insights_at_offsets.return_value = {}
     mock_db.get_all_follower_ids.return_value = set()
     return mock_db
 
@@ -116,3 +117,61 @@ async def test_execute_with_follower_changes(
     assert "Lost (1):" in report
     assert " - @lost_user3" in report
     mock_db_manager.replace_followers.assert_called_once_with({1, 2, 4, 5})
+
+
+@pytest.mark.asyncio
+async def test_execute_get_me_failure(insights_agent, mock_x_service, mock_db_manager):
+    """A failed metrics lookup aborts without touching the follower list."""
+    mock_x_service.get_me.side_effect = tweepy.errors.TweepyException("boom")
+
+    assert await insights_agent.execute() is None
+    mock_db_manager.replace_followers.assert_not_called()
+    mock_db_manager.add_insight.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_lookup_failure_keeps_follower_snapshot(
+    insights_agent, mock_x_service, mock_db_manager
+):
+    """A failed username lookup leaves the old followers to diff next run."""
+    mock_me = MagicMock()
+    mock_me.public_metrics = {"followers_count": 2}
+    mock_me.created_at = None
+    mock_x_service.get_me.return_value = MagicMock(data=mock_me)
+    mock_x_service.get_follower_user_ids.return_value = {1, 2}
+    mock_db_manager.get_all_follower_ids.return_value = {1, 3}
+    mock_x_service.get_users_by_ids.side_effect = tweepy.errors.TweepyException(
+        "rate limited"
+    )
+
+    with pytest.raises(tweepy.errors.TweepyException):
+        await insights_agent.execute()
+
+    mock_db_manager.replace_followers.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_unexpected_error_cancels_follower_fetch(
+    insights_agent, mock_x_service
+):
+    """An unexpected get_me error doesn't leave the follower fetch running."""
+    fetch_cancelled = asyncio.Event()
+
+    async def get_follower_user_ids():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            fetch_cancelled.set()
+            raise
+
+    async def get_me():
+        await asyncio.sleep(0)  # Let the follower fetch start
+        raise RuntimeError("boom")
+
+    mock_x_service.get_follower_user_ids.side_effect = get_follower_user_ids
+    mock_x_service.get_me.side_effect = get_me
+
+    with pytest.raises(RuntimeError):
+        await insights_agent.execute()
+
+    await asyncio.wait_for(fetch_cancelled.wait(), timeout=1)
@@ -35,12 +35,43 @@ def test_run_migrations_creates_tables(db_manager, test_db_path):
     conn.close()
 
 
+def test_lookup_indexes_are_used(db_manager, test_db_path):
+    run_migrations(db_manager)
+
+    conn = sqlite3.connect(test_db_path)
+    plan = conn.execute(
+        """
+        EXPLAIN QUERY PLAN
+        SELECT user_id FROM blocked_users
+        WHERE status IN ('PENDING', 'FAILED') AND user_id > ?
+        ORDER BY user_id LIMIT ?
+        """,
+        (0, 10),
+    ).fetchall()
+    assert "idx_blocked_users_pending" in str(plan)
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM insights ORDER BY timestamp DESC, id DESC LIMIT 1"
+    ).fetchall()
+    assert "idx_insights_timestamp" in str(plan)
+
+    plan = conn.execute(
+        """
+        EXPLAIN QUERY PLAN
+        SELECT user_id FROM following_users WHERE status IN ('PENDING', 'FAILED')
+        """
+    ).fetchall()
+    assert "idx_following_users_pending" in str(plan)
+    conn.close()
+
+
 def test_run_migrations_is_idempotent(db_manager, test_db_path):
     # Run twice
     run_migrations(db_manager)
     run_migrations(db_manager)
 
-    applied = _get_applied_versions(db_manager)
+    with db_manager.transaction() as conn:
+        applied = _get_applied_versions(conn.cursor())
     assert len(applied) >= 2
     assert 1 in applied
     assert 2 in applied
@@ -52,3 +83,61 @@ def test_migration_backup_triggered(db_manager, test_db_path, tmp_path):
         run_migrations(db_manager)
         # Should be called once because we have one pending migration (v1)
         assert mock_backup.called
+
+
+def test_current_schema_skips_migration_table(db_manager, test_db_path):
+    run_migrations(db_manager)
+
+    conn = sqlite3.connect(test_db_path)
+    user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    with db_manager.transaction() as conn:
+        assert user_version == max(_get_applied_versions(conn.cursor()))
+
+    with patch("x_agent.migrations.runner._get_applied_versions") as mock_applied:
+        run_migrations(db_manager)
+    mock_applied.assert_not_called()
+
+
+def test_untracked_schema_version_is_backfilled(db_manager, test_db_path):
+    run_migrations(db_manager)
+    with db_manager.transaction() as conn:
+        conn.execute("PRAGMA user_version = 0")
+
+    with patch.object(db_manager, "backup_database") as mock_backup:
+        run_migrations(db_manager)
+    mock_backup.assert_not_called()
+
+    with db_manager.transaction() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] > 0
+
+
+def test_migration_classes_are_discovered_once():
+    from x_agent.migrations.runner import _get_migration_classes
+
+    first = _get_migration_classes()
+    assert _get_migration_classes() is first
+    assert [m.version for m in first] == sorted(m.version for m in first)
+
+
+def test_latest_migration_version_matches_versions_package():
+    from x_agent.migrations import LATEST_MIGRATION_VERSION
+    from x_agent.migrations.runner import _get_migration_classes
+
+    assert LATEST_MIGRATION_VERSION == _get_migration_classes()[-1].version
+
+
+def test_column_migrations_tolerate_existing_columns():
+    from x_agent.migrations.versions.m001_initial import InitialSchema
+    from x_agent.migrations.versions.m002_add_listed_count import AddListedCount
+
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    for migration in (InitialSchema(), AddListedCount()):
+        migration.up(cursor)
+        # Re-running must not fail on the columns it already added
+        migration.up(cursor)
+
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(insights)")]
+    assert columns.count("listed_count") == 1
+    conn.close()
@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from unittest.mock import MagicMock, AsyncMock, call
+from unittest.mock import MagicMock, AsyncMock
 from x_agent.agents.unblock_agent import UnblockAgent
 from x_agent.services.x_service import XService
 from x_agent.database import DatabaseManager
@@ -12,6 +13,7 @@ def mock_x_service():
     service.get_blocked_user_ids = AsyncMock()
     service.unblock_user = AsyncMock()
     service.ensure_initialized = AsyncMock()
+    service.on_rate_limit = None
     return service
 
 
@@ -56,15 +58,15 @@ async def test_execute_empty_db_fetches_from_api(
 ):
     """Test execute fetches from API when DB is empty."""
     # Setup: DB returns 0 blocked users initially
-    mock_db_manager.get_all_blocked_users_count.side_effect = [
-        0,
-        3,
+    mock_db_manager.get_blocked_users_state.side_effect = [
+        (0, 0),
+        (3, 3),
     ]  # Initial, then after insert
     # API returns 3 users
     mock_x_service.get_blocked_user_ids.return_value = {1, 2, 3}
 
     # DB returns pending users after insert
-    mock_db_manager.get_pending_blocked_users.return_value = [1, 2, 3]
+    mock_db_manager.iter_pending_blocked_users.return_value = iter([[1, 2, 3]])
 
     # Mock unblock responses
     mock_x_service.unblock_user.side_effect = ["SUCCESS", "SUCCESS", "SUCCESS"]
@@ -78,16 +80,16 @@ async def test_execute_empty_db_fetches_from_api(
     assert mock_x_service.unblock_user.await_count == 3
 
     # Check that batch status updates happened
-    mock_db_manager.update_user_statuses.assert_any_call([1, 2, 3], "UNBLOCKED")
+    mock_db_manager.apply_status_updates.assert_any_call({"UNBLOCKED": [1, 2, 3]})
 
 
 @pytest.mark.asyncio
 async def test_execute_resumes_from_db(unblock_agent, mock_x_service, mock_db_manager):
     """Test execute resumes when DB has data."""
     # Setup: DB has 5 total, 2 processed
-    mock_db_manager.get_all_blocked_users_count.return_value = 5
+    mock_db_manager.get_blocked_users_state.return_value = (5, 3)
     # Pending are 3, 4, 5
-    mock_db_manager.get_pending_blocked_users.return_value = [3, 4, 5]
+    mock_db_manager.iter_pending_blocked_users.return_value = iter([[3, 4, 5]])
 
     mock_x_service.unblock_user.side_effect = ["SUCCESS", "SUCCESS", "SUCCESS"]
 
@@ -95,7 +97,7 @@ async def test_execute_resumes_from_db(unblock_agent, mock_x_service, mock_db_ma
 
     mock_x_service.get_blocked_user_ids.assert_not_called()
     assert mock_x_service.unblock_user.await_count == 3
-    mock_db_manager.update_user_statuses.assert_any_call([3, 4, 5], "UNBLOCKED")
+    mock_db_manager.apply_status_updates.assert_any_call({"UNBLOCKED": [3, 4, 5]})
 
 
 @pytest.mark.asyncio
@@ -115,8 +117,8 @@ async def test_execute_handles_not_found_and_errors(
     unblock_agent, mock_x_service, mock_db_manager
 ):
     """Test execute handles NOT_FOUND and failure cases."""
-    mock_db_manager.get_all_blocked_users_count.return_value = 3
-    mock_db_manager.get_pending_blocked_users.return_value = [1, 2, 3]
+    mock_db_manager.get_blocked_users_state.return_value = (3, 3)
+    mock_db_manager.iter_pending_blocked_users.return_value = iter([[1, 2, 3]])
 
     mock_x_service.unblock_user.side_effect = [
         "SUCCESS",  # User 1
@@ -127,11 +129,76 @@ async def test_execute_handles_not_found_and_errors(
     await unblock_agent.execute()
 
     assert mock_x_service.unblock_user.await_count == 3
-    mock_db_manager.update_user_statuses.assert_has_calls(
-        [
-            call([1], "UNBLOCKED"),
-            call([2], "NOT_FOUND"),
-            call([3], "FAILED"),
-        ],
-        any_order=True,
+    mock_db_manager.apply_status_updates.assert_called_once_with(
+        {"UNBLOCKED": [1], "NOT_FOUND": [2], "FAILED": [3]}
     )
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_reduces_concurrency(unblock_agent):
+    """Test that rate-limit backpressure halves the unblock concurrency."""
+    assert unblock_agent._concurrency == UnblockAgent.MAX_CONCURRENCY
+
+    await unblock_agent._on_rate_limit()
+    assert unblock_agent._concurrency == UnblockAgent.MAX_CONCURRENCY // 2
+
+    await unblock_agent.set_concurrency(0)
+    assert unblock_agent._concurrency == 1
+
+
+def test_concurrency_option(mock_x_service, mock_db_manager):
+    """Test that the worker pool size can be configured and is validated."""
+    agent = UnblockAgent(mock_x_service, mock_db_manager, concurrency=4)
+    assert agent.max_concurrency == 4
+
+    with pytest.raises(ValueError, match="Concurrency must be at least 1"):
+        UnblockAgent(mock_x_service, mock_db_manager, concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_throttled_workers_drain_queue(
+    unblock_agent, mock_x_service, mock_db_manager
+):
+    """Test that parked workers are released once all IDs have been queued."""
+    mock_db_manager.get_blocked_users_state.return_value = (5, 5)
+    mock_db_manager.iter_pending_blocked_users.return_value = iter([[1, 2, 3, 4, 5]])
+    mock_x_service.unblock_user.return_value = "SUCCESS"
+    await unblock_agent.set_concurrency(1)
+
+    await asyncio.wait_for(unblock_agent.execute(), timeout=5)
+
+    assert mock_x_service.unblock_user.await_count == 5
+    mock_db_manager.apply_status_updates.assert_called_once_with(
+        {"UNBLOCKED": [1, 2, 3, 4, 5]}
+    )
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_bounds_requests_in_flight(mock_x_service, mock_db_manager):
+    """Test that after a rate limit, fewer unblock requests run at once."""
+    agent = UnblockAgent(mock_x_service, mock_db_manager, concurrency=4)
+    user_ids = list(range(1, 41))
+    mock_db_manager.get_blocked_users_state.return_value = (40, 40)
+    mock_db_manager.iter_pending_blocked_users.return_value = iter([user_ids])
+    in_flight = 0
+    in_flight_at_start = []
+
+    async def unblock_user(user_id):
+        nonlocal in_flight
+        if user_id == 10:
+            await mock_x_service.on_rate_limit()
+        in_flight += 1
+        in_flight_at_start.append(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "SUCCESS"
+
+    mock_x_service.unblock_user.side_effect = unblock_user
+
+    await asyncio.wait_for(agent.execute(), timeout=5)
+
+    assert max(in_flight_at_start[:8]) == 4
+    # Requests already in flight finish; the ones after stay within the limit
+    assert max(in_flight_at_start[-20:]) == 2
+    # The shared service no longer calls into this agent
+    assert mock_x_service.on_rate_limit is None
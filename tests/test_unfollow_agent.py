@@ -33,8 +33,9 @@ async def test_execute_first_run(unfollow_agent, mock_x_service, mock_db_manager
 
     mock_x_service.get_follower_user_ids.assert_awaited_once()
     mock_db_manager.get_all_follower_ids.assert_called_once()
-    mock_db_manager.replace_followers.assert_called_once_with({101, 102})
-    mock_db_manager.log_unfollows.assert_not_called()
+    mock_db_manager.replace_followers_and_log_unfollows.assert_called_once_with(
+        {101, 102}, set()
+    )
 
 
 @pytest.mark.asyncio
@@ -47,8 +48,9 @@ async def test_execute_detect_unfollow(unfollow_agent, mock_x_service, mock_db_m
 
     # 101 was in DB but not in API -> Unfollowed
     # 103 is new
-    mock_db_manager.log_unfollows.assert_called_once_with([101])
-    mock_db_manager.replace_followers.assert_called_once_with({102, 103})
+    mock_db_manager.replace_followers_and_log_unfollows.assert_called_once_with(
+        {102, 103}, {101}
+    )
 
 
 @pytest.mark.asyncio
@@ -59,5 +61,15 @@ async def test_execute_no_changes(unfollow_agent, mock_x_service, mock_db_manage
 
     await unfollow_agent.execute()
 
-    mock_db_manager.log_unfollows.assert_not_called()
-    mock_db_manager.replace_followers.assert_called_once_with({101, 102})
+    mock_db_manager.replace_followers_and_log_unfollows.assert_called_once_with(
+        {101, 102}, set()
+    )
+
+
+def test_report_stats_lists_sorted_unfollows(unfollow_agent, capsys):
+    """Test the report lists unfollowed IDs in ascending order."""
+    unfollow_agent._report_stats(10, {303, 101}, 2)
+
+    out = capsys.readouterr().out
+    assert "Unfollows:       2" in out
+    assert "IDs that unfollowed you:\n - 101\n - 303\n" in out
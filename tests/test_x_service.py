@@ -1,3 +1,7 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import tweepy.asynchronous
 import tweepy
@@ -90,6 +94,50 @@ async def test_get_blocked_user_ids(x_service, mock_api_v1):
     mock_api_v1.get_blocked_ids.assert_called_once_with(cursor=-1)
 
 
+@pytest.mark.asyncio
+async def test_get_blocked_user_ids_resumes_from_checkpoint(
+    x_service, mock_api_v1, tmp_path
+):
+    """An interrupted fetch continues from the saved cursor on the next call."""
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    x_service.blocked_ids_checkpoint = checkpoint
+    x_service.user_id = 12345
+    mock_api_v1.get_blocked_ids.side_effect = [
+        ([101, 102], (None, 5)),
+        ValueError("boom"),
+        ([103], (None, 0)),
+    ]
+
+    with pytest.raises(ValueError):
+        await x_service.get_blocked_user_ids(resume=True)
+    assert checkpoint.exists()
+
+    ids = await x_service.get_blocked_user_ids(resume=True)
+
+    assert ids == {101, 102, 103}
+    mock_api_v1.get_blocked_ids.assert_called_with(cursor=5)
+    assert not checkpoint.exists()
+
+
+@pytest.mark.asyncio
+async def test_get_blocked_user_ids_ignores_torn_checkpoint_line(
+    x_service, mock_api_v1, tmp_path
+):
+    """A page cut off mid-append is fetched again from the previous cursor."""
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    x_service.blocked_ids_checkpoint = checkpoint
+    x_service.user_id = 12345
+    checkpoint.write_text(
+        '{"user_id": 12345}\n{"cursor": 5, "ids": [101, 102]}\n{"cursor": 9, "ids": [10'
+    )
+    mock_api_v1.get_blocked_ids.side_effect = [([103], (None, 0))]
+
+    ids = await x_service.get_blocked_user_ids(resume=True)
+
+    assert ids == {101, 102, 103}
+    mock_api_v1.get_blocked_ids.assert_called_once_with(cursor=5)
+
+
 @pytest.mark.asyncio
 async def test_unblock_user_success(x_service, mock_api_v1):
     """Test unblock_user success."""
@@ -99,6 +147,104 @@ async def test_unblock_user_success(x_service, mock_api_v1):
     assert result == "SUCCESS"
 
 
+@pytest.mark.asyncio
+async def test_unblock_user_calls_run_concurrently(x_service, mock_api_v1):
+    """Unblocks don't queue behind each other on the v1 lock."""
+    both_in_flight = threading.Barrier(2, timeout=5)
+    mock_api_v1.destroy_block.side_effect = lambda user_id: both_in_flight.wait()
+
+    results = await asyncio.gather(x_service.unblock_user(1), x_service.unblock_user(2))
+
+    assert results == ["SUCCESS", "SUCCESS"]
+
+
+def test_unblock_api_is_per_thread(x_service):
+    """Unblock threads don't share a tweepy.API, and so a requests.Session."""
+    with patch(
+        "x_agent.services.x_service.tweepy.API", side_effect=lambda *a, **k: MagicMock()
+    ):
+        main_api = x_service._get_unblock_api()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            other_api = pool.submit(x_service._get_unblock_api).result()
+
+        assert x_service._get_unblock_api() is main_api
+        assert other_api is not main_api
+
+
+@pytest.mark.asyncio
+async def test_unblock_user_rate_limit_signals_once(x_service, mock_api_v1):
+    """Unblocks hitting the same rate limit wait it out, signalling it once."""
+    reset_at = str(int(time.time()) + 60)
+    response = MagicMock(
+        status=429, status_code=429, headers={"x-rate-limit-reset": reset_at}
+    )
+    limited = iter([tweepy.errors.TooManyRequests(response)] * 2)
+
+    def destroy_block(user_id):
+        if error := next(limited, None):
+            raise error
+
+    mock_api_v1.destroy_block.side_effect = destroy_block
+    x_service.on_rate_limit = AsyncMock()
+
+    with patch("x_agent.services.x_service.asyncio.sleep", AsyncMock()) as mock_sleep:
+        results = await asyncio.gather(
+            x_service.unblock_user(1), x_service.unblock_user(2)
+        )
+
+    assert results == ["SUCCESS", "SUCCESS"]
+    x_service.on_rate_limit.assert_awaited_once()
+    assert mock_sleep.await_count == 2
+    assert all(55 < c.args[0] <= 65 for c in mock_sleep.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_unblock_user_rate_limit_backoff_resets_on_success(
+    x_service, mock_api_v1
+):
+    """Header-less v1 limits back off exponentially until an unblock succeeds."""
+    response = MagicMock(status=429, status_code=429, headers={})
+    limited = tweepy.errors.TooManyRequests(response)
+    mock_api_v1.destroy_block.side_effect = [limited, limited, None, limited, None]
+    clock = [1000.0]
+
+    async def sleep(seconds):
+        clock[0] += seconds
+
+    mock_sleep = AsyncMock(side_effect=sleep)
+    with (
+        patch("x_agent.services.x_service.time.time", lambda: clock[0]),
+        patch("x_agent.services.x_service.asyncio.sleep", mock_sleep),
+        patch("x_agent.services.x_service.random.uniform", return_value=0),
+    ):
+        assert await x_service.unblock_user(1) == "SUCCESS"
+        assert await x_service.unblock_user(2) == "SUCCESS"
+
+    waits = [c.args[0] for c in mock_sleep.await_args_list]
+    assert waits == [65, 125, 65]
+
+
+@pytest.mark.asyncio
+async def test_unblock_user_consecutive_rate_limits_are_raised(x_service, mock_api_v1):
+    """An unblock limit that doesn't lift is raised instead of waited out."""
+    response = MagicMock(status=429, status_code=429, headers={})
+    mock_api_v1.destroy_block.side_effect = tweepy.errors.TooManyRequests(response)
+    clock = [1000.0]
+
+    async def sleep(seconds):
+        clock[0] += seconds
+
+    mock_sleep = AsyncMock(side_effect=sleep)
+    with (
+        patch("x_agent.services.x_service.time.time", lambda: clock[0]),
+        patch("x_agent.services.x_service.asyncio.sleep", mock_sleep),
+    ):
+        with pytest.raises(tweepy.errors.TooManyRequests):
+            await x_service.unblock_user(1)
+
+    assert mock_sleep.await_count == XService.MAX_CONSECUTIVE_RATE_LIMITS
+
+
 @pytest.mark.asyncio
 async def test_unblock_user_not_found(x_service, mock_api_v1):
     """Test unblock_user returns NOT_FOUND on 404 if user doesn't exist."""
@@ -280,3 +426,46 @@ async def test_unfollow_user_success(x_service, mock_api_v1):
 
     mock_api_v1.destroy_friendship.assert_called_once_with(user_id=888)
     assert result == "SUCCESS"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_without_headers_backs_off_exponentially(x_service):
+    """Header-less rate limits wait 1m, 2m, 4m... capped at 15m, plus jitter."""
+    error = MagicMock(response=MagicMock(headers={}))
+    with (
+        patch("x_agent.services.x_service.asyncio.sleep", AsyncMock()) as mock_sleep,
+        patch("x_agent.services.x_service.random.uniform", return_value=0),
+    ):
+        for _ in range(5):
+            await x_service._handle_v2_rate_limit(error)
+
+    waits = [c.args[0] for c in mock_sleep.await_args_list]
+    assert waits == [60, 120, 240, 480, 900]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_ignores_non_numeric_headers(x_service):
+    """An HTTP-date Retry-After falls back to the backoff instead of raising."""
+    headers = {"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}
+    error = MagicMock(response=MagicMock(headers=headers))
+    with (
+        patch("x_agent.services.x_service.asyncio.sleep", AsyncMock()) as mock_sleep,
+        patch("x_agent.services.x_service.random.uniform", return_value=0),
+    ):
+        await x_service._handle_v2_rate_limit(error)
+
+    mock_sleep.assert_awaited_once_with(60)
+
+
+@pytest.mark.asyncio
+async def test_consecutive_rate_limits_are_raised(x_service, mock_async_client):
+    """A limit that doesn't lift is raised once the retry budget runs out."""
+    response = MagicMock(status=429, status_code=429, headers={"retry-after": "1"})
+    mock_async_client.delete_tweet = AsyncMock(
+        side_effect=tweepy.errors.TooManyRequests(response)
+    )
+    with patch("x_agent.services.x_service.asyncio.sleep", AsyncMock()) as mock_sleep:
+        with pytest.raises(tweepy.errors.TooManyRequests):
+            await x_service.delete_tweet(1)
+
+    assert mock_sleep.await_count == XService.MAX_CONSECUTIVE_RATE_LIMITS